@@ -1,5 +1,18 @@
-from .auth import router as auth_router
-from .menu import router as menu_router
-from .documents import router as documents_router
+import importlib
 
-__all__ = ["auth_router", "menu_router", "documents_router"]
\ No newline at end of file
+# Routers are imported on first access, so tools that only need app.api.<module> stay light
+_EXPORTS = {
+    "auth_router": ".auth",
+    "menu_router": ".menu",
+    "documents_router": ".documents",
+    "stats_router": ".stats",
+    "jobs_router": ".jobs",
+}
+
+__all__ = ["auth_router", "menu_router", "documents_router", "stats_router", "jobs_router"]
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return importlib.import_module(_EXPORTS[name], __name__).router
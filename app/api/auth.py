@@ -1,24 +1,24 @@
 from fastapi import APIRouter, HTTPException, Depends, status, Request
 from fastapi.security import HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
-from slowapi import Limiter
-from slowapi.util import get_remote_address
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta
 
-from ..database import get_db
+from ..database import get_read_db
 from ..models import User
 from ..schemas import UserCreate, UserResponse, UserLogin, Token
-from ..core.security import get_password_hash, create_access_token
+from ..core.security import get_password_hash_async, create_access_token
 from ..core.deps import authenticate_user, get_current_user, get_user, get_user_by_email
+from ..core.principals import permission_version
+from ..core.limiter import limiter
+from ..utils.writes import write_queue
 from ..config import settings
 
 router = APIRouter()
-limiter = Limiter(key_func=get_remote_address)
 
 @router.post("/login", response_model=Token)
-@limiter.limit("5/minute")
-async def login(request: Request, user_credentials: UserLogin, db: Session = Depends(get_db)):
-    user = authenticate_user(db, user_credentials.username, user_credentials.password)
+@limiter.limit(settings.rate_limit_login)
+async def login(request: Request, user_credentials: UserLogin, db: AsyncSession = Depends(get_read_db)):
+    user = await authenticate_user(db, user_credentials.username, user_credentials.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -27,8 +27,11 @@ async def login(request: Request, user_credentials: UserLogin, db: Session = Dep
         )
     
     access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
+    token_data = {"sub": user.username}
+    if settings.token_permission_version:
+        token_data["pv"] = permission_version(user.permissions, user.is_active)
     access_token = create_access_token(
-        data={"sub": user.username}, expires_delta=access_token_expires
+        data=token_data, expires_delta=access_token_expires
     )
     
     return {
@@ -38,34 +41,40 @@ async def login(request: Request, user_credentials: UserLogin, db: Session = Dep
     }
 
 @router.post("/register", response_model=UserResponse)
-@limiter.limit("3/minute")
-async def register(request: Request, user: UserCreate, db: Session = Depends(get_db)):
+@limiter.limit(settings.rate_limit_register)
+async def register(request: Request, user: UserCreate, db: AsyncSession = Depends(get_read_db)):
     # Check if user already exists
-    db_user = get_user(db, user.username)
+    db_user = await get_user(db, user.username)
     if db_user:
         raise HTTPException(status_code=400, detail="Username already registered")
     
-    db_user = get_user_by_email(db, user.email)
+    db_user = await get_user_by_email(db, user.email)
     if db_user:
         raise HTTPException(status_code=400, detail="Email already registered")
     
     # Create new user
-    hashed_password = get_password_hash(user.password)
-    db_user = User(
-        username=user.username,
-        email=user.email,
-        hashed_password=hashed_password,
-        permissions=["read"]  # Default permissions
-    )
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
-    
-    return db_user
+    hashed_password = await get_password_hash_async(user.password)
+
+    async def create(write_db: AsyncSession):
+        db_user = User(
+            username=user.username,
+            email=user.email,
+            hashed_password=hashed_password,
+            permissions=["read"]  # Default permissions
+        )
+        write_db.add(db_user)
+        await write_db.flush()
+        await write_db.refresh(db_user)
+        return db_user
+
+    return await write_queue.submit(create)
 
 @router.get("/me", response_model=UserResponse)
-async def get_current_user_info(current_user: User = Depends(get_current_user)):
-    return current_user
+async def get_current_user_info(current_user: dict = Depends(get_current_user), db: AsyncSession = Depends(get_read_db)):
+    user = await db.get(User, current_user["id"])
+    if user is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return user
 
 @router.post("/logout")
 async def logout():
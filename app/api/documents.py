@@ -1,71 +1,486 @@
-from fastapi import APIRouter, HTTPException, Depends
-from sqlalchemy.orm import Session
-from typing import List
-from ..core.deps import get_db, get_current_user
-from ..models.document import Document
-from ..schemas.document import DocumentCreate, DocumentResponse
+import hashlib
+import io
+import mimetypes
+import os
+from urllib.parse import quote
+from fastapi import APIRouter, HTTPException, Depends, Query, Request, Response, UploadFile, File
+from fastapi.responses import FileResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import exists, func, select, tuple_, cast
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Union
+from datetime import datetime
+from ..core.deps import get_read_db, get_current_user, get_optional_user
+from ..core.cache import etag_matches, is_conditional, is_not_modified, not_modified, validator_headers, weak_etag
+from ..models.document import Document, DocumentCategory
+from ..schemas.document import (
+    DocumentCreate, DocumentResponse, DocumentListResponse, DocumentSearchRequest, DocumentCategoryResponse,
+    DocumentHighlightsResponse, DocumentImportResponse, LocalizedDocumentCategoryResponse, LocalizedDocumentResponse,
+)
 from ..core.security import check_permission
+from ..core.limiter import limiter, user_or_ip_key
+from ..utils.pagination import encode_cursor, decode_cursor
+from ..utils.i18n import ALL_LANGUAGES, DEFAULT_LANGUAGE, VARY_LANGUAGE, get_language, localize, projected
+from ..search import get_backend
+from ..utils.tree import load_tree
+from ..utils.downloads import download_recorder, resolve_media_path
+from ..utils.highlights import FEATURED, POPULAR, highlights
+from ..utils.jobs import job_queue
+from ..utils.storage import store_upload, UploadTooLarge
+from ..utils.tasks import enqueue_document_jobs
+from ..utils import bulk
+from ..utils.serialization import json_response
+from ..utils.versions import DOWNLOADS_VERSION, read_versions
+from ..utils.writes import write_queue
+from ..database import SessionLocal, read_session
+from ..config import settings
 
 router = APIRouter()
 
-@router.get("", response_model=List[DocumentResponse])
-async def get_documents(category: str = None, lang: str = "uz", db: Session = Depends(get_db)):
-    query = db.query(Document).filter(Document.is_active == True)
-    if category:
-        query = query.filter(Document.category == category)
-    documents = query.order_by(Document.created_at).all()
-    return documents
-
-@router.get("/{doc_id}", response_model=DocumentResponse)
-async def get_document(doc_id: int, db: Session = Depends(get_db)):
-    document = db.query(Document).filter(Document.id == doc_id).first()
+# Columns needed by DocumentSummaryResponse; content and metadata stay on disk.
+# Reads select plain rows, never ORM instances: no identity map, no attribute instrumentation.
+SUMMARY_COLUMNS = (
+    Document.id, Document.title, Document.document_number, Document.document_type,
+    Document.category, Document.issue_date, Document.effective_date, Document.file_size,
+    Document.file_type, Document.download_count, Document.is_featured, Document.created_at,
+)
+
+# Exactly the columns of DocumentResponse
+DETAIL_COLUMNS = tuple(Document.__table__.c[name] for name in DocumentResponse.model_fields)
+
+# JSON columns holding {"uz": ..., "ru": ..., "en": ...}; projected to one language in SQL
+LOCALIZED_COLUMNS = ("title", "description")
+
+def localized_columns(columns, lang: str) -> list:
+    return [projected(column, lang) if column.key in LOCALIZED_COLUMNS else column for column in columns]
+
+def document_summary(document) -> dict:
+    return {
+        "id": document.id,
+        "title": document.title,
+        "document_number": document.document_number,
+        "document_type": document.document_type,
+        "category": document.category,
+        "issue_date": document.issue_date,
+        "effective_date": document.effective_date,
+        "file_size": document.file_size,
+        "file_type": document.file_type,
+        "download_count": document.download_count or 0,
+        "is_featured": bool(document.is_featured),
+        "created_at": document.created_at,
+    }
+
+def _has_tag(dialect: str, tag: str):
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import JSONB
+        return cast(Document.tags, JSONB).contains([tag])
+    tags = func.json_each(Document.tags).table_valued("value")
+    return exists(select(1).select_from(tags).where(tags.c.value == tag))
+
+def document_filters(params: DocumentSearchRequest, dialect: str) -> list:
+    filters = [Document.is_active == True]
+    if params.document_type:
+        filters.append(Document.document_type == params.document_type)
+    if params.category:
+        filters.append(Document.category == params.category)
+    if params.is_featured is not None:
+        filters.append(Document.is_featured == params.is_featured)
+    if params.date_from:
+        filters.append(Document.issue_date >= params.date_from)
+    if params.date_to:
+        filters.append(Document.issue_date <= params.date_to)
+    for tag in params.tags or []:
+        filters.append(_has_tag(dialect, tag))
+    return filters
+
+def listing_query(filters: list, lang: str = DEFAULT_LANGUAGE):
+    """Unranked listing in keyset order; served by the ix_documents_active_* indexes."""
+    return (
+        select(*localized_columns(SUMMARY_COLUMNS, lang))
+        .where(*filters)
+        .order_by(Document.created_at, Document.id)
+    )
+
+def search_queries(filters: list, ranked, lang: str = DEFAULT_LANGUAGE):
+    """Relevance-ordered page query and its count for full-text matches.
+
+    The matches are a MATERIALIZED CTE, so the MATCH / @@ runs once per
+    search, never once per candidate document row.
+    """
+    matches = ranked.cte("matches").prefix_with("MATERIALIZED")
+    query = (
+        select(*localized_columns(SUMMARY_COLUMNS, lang)).where(*filters)
+        .join(matches, matches.c.document_id == Document.id)
+        .order_by(matches.c.rank.desc(), Document.id)
+    )
+    count_query = (
+        select(func.count(Document.id)).where(*filters)
+        .join_from(Document, matches, matches.c.document_id == Document.id)
+    )
+    return query, count_query
+
+def search_params(
+    query: Optional[str] = None,
+    document_type: Optional[str] = None,
+    category: Optional[str] = None,
+    tags: Optional[List[str]] = Query(None),
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    is_featured: Optional[bool] = None,
+    page: int = Query(1, ge=1),
+    per_page: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+) -> DocumentSearchRequest:
+    return DocumentSearchRequest(
+        query=query, document_type=document_type, category=category, tags=tags,
+        date_from=date_from, date_to=date_to, is_featured=is_featured,
+        page=page, per_page=per_page, cursor=cursor,
+    )
+
+def list_etag(request: Request, lang: str, version: int, downloads_version: int) -> str:
+    # Same versions + same normalized query = same body; hashes the request, not the response
+    query = sorted(request.query_params.multi_items())
+    digest = hashlib.blake2s(repr((query, lang)).encode(), digest_size=8).hexdigest()
+    return weak_etag("documents", version, downloads_version, digest)
+
+@router.get("", response_model=DocumentListResponse)
+async def get_documents(
+    request: Request,
+    params: DocumentSearchRequest = Depends(search_params),
+    lang: str = Depends(get_language),
+    db: AsyncSession = Depends(get_read_db)
+):
+    # download_count is in the body; it moves the listing validators at most every download_count_publish_interval
+    versions = await read_versions(db, "documents", DOWNLOADS_VERSION)
+    etag = list_etag(request, lang, *(version for version, _ in versions))
+    last_modified = max((updated_at for _, updated_at in versions if updated_at), default=None)
+    headers = validator_headers(etag, last_modified, settings.document_list_cache_control, VARY_LANGUAGE)
+    if is_not_modified(request, etag, last_modified):
+        return not_modified(headers)
+
+    dialect = db.get_bind().dialect.name
+    filters = document_filters(params, dialect)
+    ranked = get_backend(dialect).ranked(params.query, lang) if params.query else None
+    next_cursor = None
+
+    if ranked is not None:
+        query, count_query = search_queries(filters, ranked, lang)
+        total = (await db.execute(count_query)).scalar()
+        # Relevance order has no stable keyset, so search results page by offset
+        query = query.offset((params.page - 1) * params.per_page).limit(params.per_page)
+        documents = (await db.execute(query)).all()
+    else:
+        total = (await db.execute(select(func.count(Document.id)).where(*filters))).scalar()
+        query = listing_query(filters, lang)
+        if params.cursor:
+            try:
+                created_at, last_id = decode_cursor(params.cursor)
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+            query = query.where(tuple_(Document.created_at, Document.id) > tuple_(created_at, last_id))
+        elif params.page > 1:
+            query = query.offset((params.page - 1) * params.per_page)
+
+        # One extra row tells us whether there is a next page without a second query
+        documents = (await db.execute(query.limit(params.per_page + 1))).all()
+        if len(documents) > params.per_page:
+            documents = documents[:params.per_page]
+            next_cursor = encode_cursor(documents[-1].created_at, documents[-1].id)
+
+    return json_response(DocumentListResponse, {
+        "documents": [document_summary(document) for document in documents],
+        "total": total,
+        "page": params.page,
+        "per_page": params.per_page,
+        "pages": (total + params.per_page - 1) // params.per_page,
+        "next_cursor": next_cursor,
+    }, headers=headers)
+
+@router.get(
+    "/categories",
+    response_model=Union[List[LocalizedDocumentCategoryResponse], List[DocumentCategoryResponse]],
+)
+async def get_categories(
+    document_type: Optional[str] = None,
+    depth: Optional[int] = Query(None, ge=1),
+    lang: str = Depends(get_language),
+    db: AsyncSession = Depends(get_read_db)
+):
+    filters = {"document_type": document_type} if document_type else {}
+    categories = await load_tree(
+        db, DocumentCategory, max_depth=depth, localized=("name", "description"), lang=lang, **filters
+    )
+    response_type = DocumentCategoryResponse if lang == ALL_LANGUAGES else LocalizedDocumentCategoryResponse
+    return json_response(List[response_type], categories, headers=VARY_LANGUAGE)
+
+@router.get("/highlights", response_model=DocumentHighlightsResponse)
+async def get_highlights(
+    document_type: Optional[str] = None,
+    limit: int = Query(10, ge=1, le=50),
+    lang: str = Depends(get_language)
+):
+    # Served from the in-process ranked index; no database access once it is loaded
+    await highlights.ensure_loaded()
+
+    def localized(entries):
+        if lang == ALL_LANGUAGES:
+            return entries
+        return [{**entry, "title": localize(entry["title"], lang)} for entry in entries]
+
+    return json_response(DocumentHighlightsResponse, {
+        "featured": localized(highlights.top(FEATURED, document_type, limit)),
+        "popular": localized(highlights.top(POPULAR, document_type, limit)),
+    }, headers={**VARY_LANGUAGE, "Cache-Control": settings.document_list_cache_control})
+
+@router.get("/export")
+async def export_documents(
+    format: str = Query("jsonl", pattern="^(jsonl|csv)$"),
+    current_user: dict = Depends(get_current_user)
+):
+    if not check_permission(current_user, "read"):
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+
+    async def rows():
+        # Own session: request-scoped dependencies are closed before streaming starts
+        async with read_session() as db:
+            yield bulk.export_header(format)
+            result = await db.stream(bulk.export_statement())
+            async for row in result.mappings():
+                yield bulk.export_line(row, format)
+
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        rows(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="documents.{format}"'},
+    )
+
+@router.post("/import", response_model=DocumentImportResponse)
+@limiter.limit(settings.rate_limit_write, key_func=user_or_ip_key)
+async def import_documents(
+    request: Request,
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(None, pattern="^(jsonl|ndjson|csv)$"),
+    batch_size: int = Query(settings.import_batch_size, ge=1, le=10000),
+    current_user: dict = Depends(get_current_user)
+):
+    if not check_permission(current_user, "write"):
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    try:
+        fmt = bulk.detect_format(file.filename, format)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    def run_import():
+        lines = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+        with SessionLocal() as db:
+            return bulk.import_documents(db, lines, fmt, batch_size, created_by=current_user["id"])
+
+    report = await run_in_threadpool(run_import)
+    return {"imported": report.imported, "failed": report.failed, "errors": report.errors}
+
+def document_validators(doc_id: int, lang: str, updated_at: Optional[datetime], download_count: Optional[int]) -> dict:
+    # download_count is part of the body but does not move updated_at
+    stamp = int(updated_at.timestamp() * 1_000_000) if updated_at else 0
+    etag = weak_etag("document", doc_id, stamp, download_count or 0, lang)
+    return validator_headers(etag, updated_at, settings.document_cache_control)
+
+@router.get("/{doc_id}", response_model=Union[DocumentResponse, LocalizedDocumentResponse])
+async def get_document(
+    doc_id: int,
+    request: Request,
+    # Full translations by default: this is what editing forms load
+    lang: Optional[str] = Query(None, pattern="^(uz|ru|en|all)$"),
+    db: AsyncSession = Depends(get_read_db)
+):
+    lang = lang or ALL_LANGUAGES
+    if is_conditional(request):
+        # Revalidation reads two columns by primary key and never loads the document
+        stamp = (await db.execute(
+            select(Document.updated_at, Document.download_count).where(Document.id == doc_id)
+        )).first()
+        if not stamp:
+            raise HTTPException(status_code=404, detail="Document not found")
+        headers = document_validators(doc_id, lang, *stamp)
+        if is_not_modified(request, headers["ETag"], stamp.updated_at):
+            return not_modified(headers)
+
+    columns = localized_columns(DETAIL_COLUMNS, lang)
+    document = (await db.execute(select(*columns).where(Document.id == doc_id))).mappings().first()
     if not document:
         raise HTTPException(status_code=404, detail="Document not found")
-    return document
+    headers = document_validators(doc_id, lang, document["updated_at"], document["download_count"])
+    response_type = DocumentResponse if lang == ALL_LANGUAGES else LocalizedDocumentResponse
+    return json_response(response_type, document, headers=headers)
+
+@router.get("/{doc_id}/download")
+async def download_document(
+    doc_id: int,
+    request: Request,
+    current_user: Optional[dict] = Depends(get_optional_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    row = (await db.execute(
+        select(Document.file_path, Document.file_type, Document.document_number, Document.is_active)
+        .where(Document.id == doc_id)
+    )).first()
+    if not row or not row.is_active or not row.file_path:
+        raise HTTPException(status_code=404, detail="Document not found")
+    path = resolve_media_path(row.file_path)
+    if path is None or not path.is_file():
+        raise HTTPException(status_code=404, detail="File not found")
+
+    # Stored blobs are named by hash; offer the document number instead
+    filename = os.path.basename(row.file_path)
+    if not os.path.splitext(filename)[1]:
+        extension = mimetypes.guess_extension(row.file_type or "") or ""
+        filename = f"{row.document_number or doc_id}{extension}"
+    disposition = f"attachment; filename*=utf-8''{quote(filename)}"
+
+    if settings.download_accel_prefix:
+        # nginx serves the bytes itself (sendfile, Range, validators)
+        response = Response(headers={
+            "X-Accel-Redirect": settings.download_accel_prefix + quote(row.file_path),
+            "Content-Type": row.file_type or "application/octet-stream",
+            "Content-Disposition": disposition,
+        })
+    else:
+        response = FileResponse(
+            path,
+            media_type=row.file_type or None,
+            headers={"Content-Disposition": disposition},
+            stat_result=path.stat(),
+        )
+        response.chunk_size = settings.download_chunk_size
+        if etag_matches(request.headers.get("if-none-match"), response.headers["etag"]):
+            return Response(status_code=304, headers={
+                "ETag": response.headers["etag"],
+                "Last-Modified": response.headers["last-modified"],
+            })
+
+    # Resumed transfers (Range past the first byte) are not counted again
+    range_header = request.headers.get("range")
+    if not range_header or range_header.replace(" ", "").startswith("bytes=0-"):
+        download_recorder.record(
+            doc_id,
+            current_user["id"] if current_user else None,
+            request.client.host if request.client else None,
+            request.headers.get("user-agent"),
+        )
+    return response
+
+def jobs_queued(response: Response, jobs: list):
+    """Start the committed jobs of a write and tell the client how to follow them."""
+    if jobs:
+        response.headers["X-Job-Ids"] = ",".join(str(job.id) for job in jobs)
+        job_queue.wake()
+
+@router.post("/{doc_id}/file", response_model=DocumentResponse)
+@limiter.limit(settings.rate_limit_write, key_func=user_or_ip_key)
+async def upload_document_file(
+    request: Request,
+    response: Response,
+    doc_id: int,
+    file: UploadFile = File(...),
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    if not check_permission(current_user, "write"):
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+    if not await db.scalar(select(exists().where(Document.id == doc_id))):
+        raise HTTPException(status_code=404, detail="Document not found")
+    # Stored before queueing: the writer never waits on an upload
+    try:
+        stored = await store_upload(file)
+    except UploadTooLarge:
+        raise HTTPException(status_code=413, detail="File is too large")
+
+    async def attach_file(db: AsyncSession):
+        db_document = await db.get(Document, doc_id)
+        if not db_document:
+            raise HTTPException(status_code=404, detail="Document not found")
+        db_document.file_path = stored.path
+        db_document.file_size = stored.size
+        db_document.file_type = stored.content_type
+        jobs = enqueue_document_jobs(db, db_document, "updated", file_uploaded=True)
+        await db.flush()
+        await db.refresh(db_document)
+        return db_document, jobs
+
+    db_document, jobs = await write_queue.submit(attach_file)
+    highlights.upsert(db_document)
+    jobs_queued(response, jobs)
+    return db_document
 
 @router.post("", response_model=DocumentResponse)
+@limiter.limit(settings.rate_limit_write, key_func=user_or_ip_key)
 async def create_document(
+    request: Request,
+    response: Response,
     document: DocumentCreate,
-    current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: dict = Depends(get_current_user)
 ):
     if not check_permission(current_user, "write"):
         raise HTTPException(status_code=403, detail="Not enough permissions")
-    db_document = Document(**document.dict())
-    db.add(db_document)
-    db.commit()
-    db.refresh(db_document)
+
+    async def create(db: AsyncSession):
+        db_document = Document(**document.dict())
+        db.add(db_document)
+        await db.flush()
+        jobs = enqueue_document_jobs(db, db_document, "created")
+        await db.flush()
+        await db.refresh(db_document)
+        return db_document, jobs
+
+    db_document, jobs = await write_queue.submit(create)
+    highlights.upsert(db_document)
+    jobs_queued(response, jobs)
     return db_document
 
 @router.put("/{doc_id}", response_model=DocumentResponse)
+@limiter.limit(settings.rate_limit_write, key_func=user_or_ip_key)
 async def update_document(
+    request: Request,
+    response: Response,
     doc_id: int,
     document: DocumentCreate,
-    current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: dict = Depends(get_current_user)
 ):
     if not check_permission(current_user, "write"):
         raise HTTPException(status_code=403, detail="Not enough permissions")
-    db_document = db.query(Document).filter(Document.id == doc_id).first()
-    if not db_document:
-        raise HTTPException(status_code=404, detail="Document not found")
-    for key, value in document.dict().items():
-        setattr(db_document, key, value)
-    db.commit()
-    db.refresh(db_document)
+
+    async def update(db: AsyncSession):
+        db_document = await db.get(Document, doc_id)
+        if not db_document:
+            raise HTTPException(status_code=404, detail="Document not found")
+        for key, value in document.dict().items():
+            setattr(db_document, key, value)
+        jobs = enqueue_document_jobs(db, db_document, "updated")
+        await db.flush()
+        await db.refresh(db_document)
+        return db_document, jobs
+
+    db_document, jobs = await write_queue.submit(update)
+    highlights.upsert(db_document)
+    jobs_queued(response, jobs)
     return db_document
 
 @router.delete("/{doc_id}")
+@limiter.limit(settings.rate_limit_write, key_func=user_or_ip_key)
 async def delete_document(
+    request: Request,
     doc_id: int,
-    current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: dict = Depends(get_current_user)
 ):
     if not check_permission(current_user, "delete"):
         raise HTTPException(status_code=403, detail="Not enough permissions")
-    db_document = db.query(Document).filter(Document.id == doc_id).first()
-    if not db_document:
-        raise HTTPException(status_code=404, detail="Document not found")
-    db.delete(db_document)
-    db.commit()
+
+    async def delete(db: AsyncSession):
+        db_document = await db.get(Document, doc_id)
+        if not db_document:
+            raise HTTPException(status_code=404, detail="Document not found")
+        await db.delete(db_document)
+
+    await write_queue.submit(delete)
+    highlights.remove(doc_id)
     return {"message": "Document deleted successfully"}
\ No newline at end of file
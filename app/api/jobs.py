@@ -0,0 +1,60 @@
+from datetime import datetime
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.deps import get_current_user, get_read_db
+from ..core.security import check_permission
+from ..models.job import Job
+from ..schemas.job import JobResponse
+from ..utils.serialization import json_response
+
+# Status of the background side effects of writes; ids come from the X-Job-Ids response header
+router = APIRouter()
+
+JOB_COLUMNS = tuple(Job.__table__.c)
+
+
+def require_write(current_user: dict):
+    if not check_permission(current_user, "write"):
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+
+
+def job_status(row) -> dict:
+    job = dict(row)
+    if job["created_at"] is not None:
+        job["latency_seconds"] = ((job["finished_at"] or datetime.utcnow()) - job["created_at"]).total_seconds()
+    return job
+
+
+@router.get("", response_model=List[JobResponse])
+async def list_jobs(
+    status: Optional[str] = Query(None, pattern="^(queued|running|succeeded|failed)$"),
+    kind: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    require_write(current_user)
+    statement = select(*JOB_COLUMNS).order_by(Job.id.desc()).limit(limit)
+    if status is not None:
+        statement = statement.where(Job.status == status)
+    if kind is not None:
+        statement = statement.where(Job.kind == kind)
+    rows = (await db.execute(statement)).mappings().all()
+    return json_response(List[JobResponse], [job_status(row) for row in rows])
+
+
+@router.get("/{job_id}", response_model=JobResponse)
+async def get_job(
+    job_id: int,
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    require_write(current_user)
+    row = (await db.execute(select(*JOB_COLUMNS).where(Job.id == job_id))).mappings().first()
+    if row is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return json_response(JobResponse, job_status(row))
@@ -1,72 +1,129 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Request, Query, Response
 from fastapi.security import HTTPBearer
-from sqlalchemy.orm import Session
-from typing import List
-from ..core.deps import get_db, get_current_user
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional, Union
+from ..core.deps import get_read_db, get_current_user
+from ..core.cache import ResponseCache, is_not_modified, not_modified, validator_headers, weak_etag
 from ..models.menu import MenuItem
-from ..schemas.menu import MenuItemCreate, MenuItemResponse
+from ..schemas.menu import LocalizedMenuItemResponse, MenuItemCreate, MenuItemResponse
 from ..core.security import check_permission
+from ..core.limiter import limiter, user_or_ip_key
+from ..config import settings
+from ..utils.tree import load_tree, load_subtree, tree_depth
+from ..utils.serialization import dump_json, json_response
+from ..utils.i18n import ALL_LANGUAGES, VARY_LANGUAGE, get_language
+from ..utils.versions import read_version
+from ..utils.writes import write_queue
 
 router = APIRouter()
 
-@router.get("", response_model=List[MenuItemResponse])
-async def get_menu(lang: str = "uz", db: Session = Depends(get_db)):
-    menu_items = db.query(MenuItem).filter(
-        MenuItem.parent_id == None,
-        MenuItem.is_active == True
-    ).order_by(MenuItem.order).all()
-    return menu_items
+# The whole serialized tree, per lang; dropped by every menu write.
+# "menu.v2": bare bodies, never read as the older "etag\n"-prefixed entries
+menu_cache = ResponseCache("menu.v2", ttl=settings.menu_cache_ttl)
 
-@router.get("/{menu_id}", response_model=MenuItemResponse)
-async def get_menu_item(menu_id: int, db: Session = Depends(get_db)):
-    menu_item = db.query(MenuItem).filter(MenuItem.id == menu_id).first()
+def menu_response_type(lang: str):
+    return MenuItemResponse if lang == ALL_LANGUAGES else LocalizedMenuItemResponse
+
+@router.get("", response_model=Union[List[LocalizedMenuItemResponse], List[MenuItemResponse]])
+async def get_menu(
+    request: Request,
+    lang: str = Depends(get_language),
+    depth: Optional[int] = Query(None, ge=1),
+    db: AsyncSession = Depends(get_read_db)
+):
+    # Deeper requests get the same tree: one ETag and cache key for all of them
+    depth = tree_depth(depth)
+    # The menu_items version answers conditional requests before any rows are read
+    version = await read_version(db, "menu_items")
+    stamp, last_modified = version if version else (0, None)
+    etag = weak_etag("menu", stamp, lang, depth or "all")
+    headers = validator_headers(etag, last_modified, settings.menu_cache_control, VARY_LANGUAGE)
+    if is_not_modified(request, etag, last_modified):
+        return not_modified(headers)
+
+    # Keyed by version too, so workers never serve a tree older than the one they validated
+    cache_key = f"{stamp}:{lang}:{depth or 'all'}"
+    body = await menu_cache.get(cache_key)
+    if body is None:
+        menu_items = await load_tree(db, MenuItem, max_depth=depth, localized=("title",), lang=lang)
+        body = dump_json(List[menu_response_type(lang)], menu_items)
+        await menu_cache.set(cache_key, body)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+@router.get("/{menu_id}", response_model=Union[LocalizedMenuItemResponse, MenuItemResponse])
+async def get_menu_item(
+    menu_id: int,
+    lang: str = Depends(get_language),
+    depth: Optional[int] = Query(None, ge=1),
+    db: AsyncSession = Depends(get_read_db)
+):
+    menu_item = await load_subtree(db, MenuItem, menu_id, max_depth=depth, localized=("title",), lang=lang)
     if not menu_item:
         raise HTTPException(status_code=404, detail="Menu item not found")
-    return menu_item
+    return json_response(menu_response_type(lang), menu_item, headers=VARY_LANGUAGE)
 
 @router.post("", response_model=MenuItemResponse)
+@limiter.limit(settings.rate_limit_write, key_func=user_or_ip_key)
 async def create_menu_item(
+    request: Request,
     menu_item: MenuItemCreate,
-    current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: dict = Depends(get_current_user)
 ):
     if not check_permission(current_user, "write"):
         raise HTTPException(status_code=403, detail="Not enough permissions")
-    db_menu_item = MenuItem(**menu_item.dict())
-    db.add(db_menu_item)
-    db.commit()
-    db.refresh(db_menu_item)
-    return db_menu_item
+
+    async def create(db: AsyncSession):
+        db_menu_item = MenuItem(**menu_item.dict())
+        db.add(db_menu_item)
+        await db.flush()
+        # Lazy-loading `children` is not possible on an async session; load the subtree explicitly
+        return await load_subtree(db, MenuItem, db_menu_item.id)
+
+    created = await write_queue.submit(create)
+    await menu_cache.invalidate()
+    return created
 
 @router.put("/{menu_id}", response_model=MenuItemResponse)
+@limiter.limit(settings.rate_limit_write, key_func=user_or_ip_key)
 async def update_menu_item(
+    request: Request,
     menu_id: int,
     menu_item: MenuItemCreate,
-    current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: dict = Depends(get_current_user)
 ):
     if not check_permission(current_user, "write"):
         raise HTTPException(status_code=403, detail="Not enough permissions")
-    db_menu_item = db.query(MenuItem).filter(MenuItem.id == menu_id).first()
-    if not db_menu_item:
-        raise HTTPException(status_code=404, detail="Menu item not found")
-    for key, value in menu_item.dict().items():
-        setattr(db_menu_item, key, value)
-    db.commit()
-    db.refresh(db_menu_item)
-    return db_menu_item
+
+    async def update(db: AsyncSession):
+        db_menu_item = await db.get(MenuItem, menu_id)
+        if not db_menu_item:
+            raise HTTPException(status_code=404, detail="Menu item not found")
+        for key, value in menu_item.dict().items():
+            setattr(db_menu_item, key, value)
+        await db.flush()
+        # Lazy-loading `children` is not possible on an async session; load the subtree explicitly
+        return await load_subtree(db, MenuItem, db_menu_item.id)
+
+    updated = await write_queue.submit(update)
+    await menu_cache.invalidate()
+    return updated
 
 @router.delete("/{menu_id}")
+@limiter.limit(settings.rate_limit_write, key_func=user_or_ip_key)
 async def delete_menu_item(
+    request: Request,
     menu_id: int,
-    current_user: dict = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: dict = Depends(get_current_user)
 ):
     if not check_permission(current_user, "delete"):
         raise HTTPException(status_code=403, detail="Not enough permissions")
-    db_menu_item = db.query(MenuItem).filter(MenuItem.id == menu_id).first()
-    if not db_menu_item:
-        raise HTTPException(status_code=404, detail="Menu item not found")
-    db.delete(db_menu_item)
-    db.commit()
+
+    async def delete(db: AsyncSession):
+        db_menu_item = await db.get(MenuItem, menu_id)
+        if not db_menu_item:
+            raise HTTPException(status_code=404, detail="Menu item not found")
+        await db.delete(db_menu_item)
+
+    await write_queue.submit(delete)
+    await menu_cache.invalidate()
     return {"message": "Menu item deleted successfully"}
\ No newline at end of file
@@ -0,0 +1,133 @@
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..core.deps import get_current_user, get_read_db
+from ..core.security import check_permission
+from ..models.document import Document
+from ..models.stats import DownloadCategoryRollup, DownloadRollup
+from ..schemas.stats import DownloadPointResponse, DownloadTotalResponse, TopDocumentResponse
+from ..utils.i18n import VARY_LANGUAGE, get_language, projected
+from ..utils.serialization import json_response
+from ..utils.stats import bucket_start
+
+# Every report reads the hourly/daily rollups only, never download_logs
+router = APIRouter()
+
+PERIOD_PATTERN = "^(hour|day)$"
+
+
+def require_read(current_user: dict):
+    if not check_permission(current_user, "read"):
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+
+
+def window_start(days: int, period: str = "day") -> datetime:
+    # Whole buckets: the first one is included in full, the current one so far
+    return bucket_start(datetime.utcnow() - timedelta(days=days), period)
+
+
+def top_query(days: int, limit: int, lang: str, document_type: Optional[str] = None, category: Optional[str] = None):
+    totals = (
+        select(DownloadRollup.document_id, func.sum(DownloadRollup.downloads).label("downloads"))
+        .where(DownloadRollup.period == "day", DownloadRollup.bucket >= window_start(days))
+        .group_by(DownloadRollup.document_id)
+    )
+    if document_type or category:
+        totals = totals.join(Document, Document.id == DownloadRollup.document_id)
+        if document_type:
+            totals = totals.where(Document.document_type == document_type)
+        if category:
+            totals = totals.where(Document.category == category)
+    top = totals.order_by(func.sum(DownloadRollup.downloads).desc()).limit(limit).subquery()
+    return (
+        select(
+            top.c.document_id, projected(Document.title, lang), Document.document_number,
+            Document.document_type, Document.category, top.c.downloads,
+        )
+        .join(Document, Document.id == top.c.document_id)
+        .order_by(top.c.downloads.desc(), top.c.document_id)
+    )
+
+
+def timeseries_query(period: str, days: int, document_id: Optional[int] = None,
+                     document_type: Optional[str] = None, category: Optional[str] = None):
+    # One document: its own rollup rows; otherwise the much smaller per-category rollup
+    if document_id is not None:
+        rollup = DownloadRollup
+        filters = [DownloadRollup.document_id == document_id]
+    else:
+        rollup = DownloadCategoryRollup
+        filters = []
+        if document_type is not None:
+            filters.append(DownloadCategoryRollup.document_type == document_type)
+        if category is not None:
+            filters.append(DownloadCategoryRollup.category == category)
+    return (
+        select(rollup.bucket, func.sum(rollup.downloads).label("downloads"))
+        .where(rollup.period == period, rollup.bucket >= window_start(days, period), *filters)
+        .group_by(rollup.bucket)
+        .order_by(rollup.bucket)
+    )
+
+
+def totals_query(days: int, by: str, document_type: Optional[str] = None):
+    keys = [func.nullif(DownloadCategoryRollup.document_type, "").label("document_type")]
+    if by == "category":
+        keys.append(func.nullif(DownloadCategoryRollup.category, "").label("category"))
+    statement = (
+        select(*keys, func.sum(DownloadCategoryRollup.downloads).label("downloads"))
+        .where(DownloadCategoryRollup.period == "day", DownloadCategoryRollup.bucket >= window_start(days))
+        .group_by(*keys)
+        .order_by(func.sum(DownloadCategoryRollup.downloads).desc())
+    )
+    if document_type is not None:
+        statement = statement.where(DownloadCategoryRollup.document_type == document_type)
+    return statement
+
+
+@router.get("/top", response_model=List[TopDocumentResponse])
+async def top_documents(
+    days: int = Query(30, ge=1, le=3660),
+    limit: int = Query(10, ge=1, le=100),
+    document_type: Optional[str] = None,
+    category: Optional[str] = None,
+    lang: str = Depends(get_language),
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    require_read(current_user)
+    rows = (await db.execute(top_query(days, limit, lang, document_type, category))).mappings().all()
+    return json_response(List[TopDocumentResponse], rows, headers=VARY_LANGUAGE)
+
+
+@router.get("/timeseries", response_model=List[DownloadPointResponse])
+async def download_timeseries(
+    period: str = Query("day", pattern=PERIOD_PATTERN),
+    days: int = Query(30, ge=1, le=3660, description="Hourly buckets only go back download_hourly_rollup_retention_days"),
+    document_id: Optional[int] = None,
+    document_type: Optional[str] = None,
+    category: Optional[str] = None,
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    require_read(current_user)
+    statement = timeseries_query(period, days, document_id, document_type, category)
+    rows = (await db.execute(statement)).mappings().all()
+    return json_response(List[DownloadPointResponse], rows)
+
+
+@router.get("/totals", response_model=List[DownloadTotalResponse])
+async def download_totals(
+    days: int = Query(30, ge=1, le=3660),
+    by: str = Query("document_type", pattern="^(document_type|category)$"),
+    document_type: Optional[str] = None,
+    current_user: dict = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
+):
+    require_read(current_user)
+    rows = (await db.execute(totals_query(days, by, document_type))).mappings().all()
+    return json_response(List[DownloadTotalResponse], rows)
@@ -1,15 +1,44 @@
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import List, Optional
 import os
 
 class Settings(BaseSettings):
     # Database
     database_url: str = "sqlite:///./tmsiti.db"
+    db_pool_size: int = 10
+    db_max_overflow: int = 20
+    db_pool_timeout: int = 30
+    db_pool_recycle: int = 1800  # seconds; keeps connections younger than server-side idle timeouts
+    db_pool_pre_ping: bool = True
+    auto_migrate: bool = False  # migrate + seed on startup; for development only
+    # SQLite files only: set on every new connection
+    sqlite_journal_mode: str = "WAL"  # readers no longer block behind the writer
+    sqlite_synchronous: str = "NORMAL"  # durable across crashes in WAL mode; fsync at checkpoints only
+    sqlite_busy_timeout: int = 5000  # ms to wait for a lock instead of failing with "database is locked"
+    sqlite_mmap_size: int = 256 * 1024 * 1024  # bytes of the file read through mmap
+    sqlite_cache_size: int = -64 * 1024  # page cache per connection; negative means KiB
+    sqlite_read_pool_size: int = 8  # read-only connections; writes use a single connection
+    # Writes are queued and committed in groups by one writer; on by default for SQLite files
+    single_writer: Optional[bool] = None
+    write_batch_size: int = 64  # most jobs committed together
+    # Read replicas for GET handlers, e.g. ["postgresql://app@replica1/tmsiti"]; SQLite files work for local testing
+    database_replica_urls: List[str] = []
+    replica_health_interval: float = 5.0  # seconds between replica health checks
+    replica_health_timeout: float = 2.0  # seconds before a replica check counts as failed
+    read_primary_cookie: str = "read_primary"  # set after a write; its holder reads from the primary
+    read_primary_seconds: int = 10  # how long reads stick to the primary after a write; covers replica lag
     
     # Security
     secret_key: str = "your-secret-key-change-in-production"
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
+    bcrypt_rounds: int = 12
+    password_hash_executor: str = "thread"  # "thread" or "process"
+    password_hash_workers: int = 2
+    password_hash_queue_limit: int = 64
+    principal_cache_size: int = 1024
+    principal_cache_ttl: int = 60  # seconds; bounds staleness across workers
+    token_permission_version: bool = True  # embed a "pv" claim so stale tokens are refused
     
     # CORS
     frontend_url: str = "https://tmsiti.uz"
@@ -24,12 +53,67 @@ class Settings(BaseSettings):
     smtp_port: int = 587
     smtp_username: str = "your-email@gmail.com"
     smtp_password: str = "your-app-password"
+    smtp_from: Optional[str] = None  # defaults to smtp_username
+    notification_recipients: List[str] = []  # emailed when documents are created or updated; empty disables
+
+    # Background jobs (app.utils.jobs)
+    job_concurrency: int = 4  # jobs running at once per worker
+    job_max_attempts: int = 5
+    job_retry_base_delay: float = 2.0  # seconds; doubled after every failed attempt
+    job_retry_max_delay: float = 600.0
+    job_lease_seconds: int = 300  # a job running longer is assumed lost and claimed again
+    job_poll_interval: float = 2.0  # seconds between checks for due jobs when nothing wakes the worker
+    job_retention_days: int = 30  # finished jobs kept for status queries; 0 keeps all
+    extract_text_max_bytes: int = 5 * 1024 * 1024  # text extracted from uploads into documents.content
     
     # Application
     app_version: str = "1.0.0"
     debug: bool = False
+    profile_startup: bool = False  # log the duration of each startup step
     redis_url: str = "redis://localhost:6379/0"
 
+    # Rate limiting
+    rate_limit_enabled: bool = True
+    rate_limit_storage_uri: Optional[str] = None  # defaults to redis_url; "memory://" for tests
+    rate_limit_login: str = "5/minute"
+    rate_limit_register: str = "3/minute"
+    rate_limit_write: str = "60/minute"  # per user on document/menu writes
+
+    # Files
+    media_root: str = "./media"
+    max_upload_size: int = 512 * 1024 * 1024
+    download_chunk_size: int = 1024 * 1024
+    download_accel_prefix: Optional[str] = None  # e.g. "/protected-media/" to hand files to nginx
+    download_flush_interval: float = 2.0  # seconds between download counter flushes
+    download_flush_batch_size: int = 500
+    download_count_publish_interval: float = 60.0  # seconds listings and highlights may lag behind download counts
+    download_log_retention_days: int = 90  # raw download_logs rows; rollups keep the counts. 0 keeps all
+    download_hourly_rollup_retention_days: int = 31  # hourly buckets; daily ones are kept. 0 keeps all
+
+    # Bulk import/export
+    import_batch_size: int = 500
+    export_chunk_rows: int = 1000
+
+    # Caching
+    cache_backend: str = "local"  # "local" or "redis" (uses redis_url)
+    cache_redis_timeout: float = 0.25  # seconds per Redis connect/command before the local cache is used
+    cache_redis_retry_interval: float = 30.0  # seconds on the local cache after a Redis failure
+    cache_local_size: int = 256  # entries per process in the local response cache
+    menu_cache_ttl: int = 300
+    # Cache-Control sent with version-validated responses (ETag + Last-Modified)
+    document_cache_control: str = "public, max-age=300"
+    document_list_cache_control: str = "public, max-age=60"
+    menu_cache_control: str = "public, max-age=60"
+    highlights_size: int = 100  # featured/popular documents kept in memory per document type
+    highlights_refresh_interval: float = 10.0  # seconds between checks of the documents version
+
+    # Observability
+    metrics_enabled: bool = True  # Prometheus endpoint at /metrics
+    slow_query_threshold_ms: float = 200  # log statements slower than this; 0 disables
+    # Also log their bound parameters: password hashes, emails and tokens end up in the log. Debugging only
+    slow_query_log_parameters: bool = False
+    request_query_warning: int = 50  # log requests running more SQL statements than this; 0 disables
+
     model_config = {
         "env_file": ".env",
         "env_file_encoding": "utf-8",
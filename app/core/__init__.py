@@ -1,2 +1,19 @@
-from .security import verify_password, get_password_hash, create_access_token
-from .deps import get_current_user, check_permission, authenticate_user
\ No newline at end of file
+import importlib
+
+# Resolved on first access so importing one app.core module does not pull in the rest
+_EXPORTS = {
+    "verify_password": ".security",
+    "get_password_hash": ".security",
+    "create_access_token": ".security",
+    "get_current_user": ".deps",
+    "check_permission": ".deps",
+    "authenticate_user": ".deps",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(_EXPORTS[name], __name__), name)
@@ -0,0 +1,179 @@
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional, Tuple
+
+from fastapi import Request, Response
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class LocalBackend:
+    """Per-process LRU of at most `max_size` entries; entries expire after their TTL."""
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            self._entries.pop(key, None)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        # Keys of old version stamps are never read again; the size bound evicts them
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    async def clear(self, prefix: str) -> None:
+        for key in [key for key in self._entries if key.startswith(prefix)]:
+            self._entries.pop(key, None)
+
+
+class RedisBackend:
+    """Shared store, so an invalidation in one worker is seen by all of them."""
+
+    def __init__(self, url: str, timeout: float):
+        from redis import asyncio as aioredis
+
+        # Bounded waits: a slow or unreachable Redis must not hold up the request
+        self._client = aioredis.Redis.from_url(url, socket_timeout=timeout, socket_connect_timeout=timeout)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self._client.get(key)
+
+    async def set(self, key: str, value: bytes, ttl: int) -> None:
+        await self._client.set(key, value, ex=ttl)
+
+    async def clear(self, prefix: str) -> None:
+        keys = [key async for key in self._client.scan_iter(match=f"{prefix}*")]
+        if keys:
+            await self._client.delete(*keys)
+
+
+def _create_backend():
+    if settings.cache_backend == "redis":
+        try:
+            return RedisBackend(settings.redis_url, settings.cache_redis_timeout)
+        except ImportError:
+            logger.warning("redis is not installed, falling back to the local response cache")
+    return LocalBackend(settings.cache_local_size)
+
+
+class ResponseCache:
+    """Serialized JSON response bodies under a namespace.
+
+    Validators come from table versions (weak_etag), so bodies are stored
+    as they are and never hashed.
+
+    When the shared backend fails, the per-process LocalBackend serves
+    instead until cache_redis_retry_interval has passed.
+    """
+
+    def __init__(self, namespace: str, ttl: int, backend=None):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.backend = backend or _create_backend()
+        self.fallback = self.backend if isinstance(self.backend, LocalBackend) else LocalBackend(settings.cache_local_size)
+        self._retry_at = 0.0
+
+    def _key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    async def _call(self, operation: str, *args):
+        if self.backend is not self.fallback and time.monotonic() >= self._retry_at:
+            try:
+                return await getattr(self.backend, operation)(*args)
+            except Exception:
+                logger.warning("Response cache %s failed, using the local cache for %.0f s",
+                               operation, settings.cache_redis_retry_interval, exc_info=True)
+                self._retry_at = time.monotonic() + settings.cache_redis_retry_interval
+        return await getattr(self.fallback, operation)(*args)
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self._call("get", self._key(key))
+
+    async def set(self, key: str, body: bytes) -> None:
+        await self._call("set", self._key(key), body, self.ttl)
+
+    async def invalidate(self) -> None:
+        await self._call("clear", f"{self.namespace}:")
+        if self.fallback is not self.backend:
+            # Entries cached while the shared backend was down
+            await self.fallback.clear(f"{self.namespace}:")
+
+
+def _opaque_tag(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison, as If-None-Match requires: W/"x" matches "x"."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return _opaque_tag(etag) in {_opaque_tag(tag) for tag in if_none_match.split(",")}
+
+
+def weak_etag(*parts) -> str:
+    """Validator built from version stamps, so no response body has to be hashed."""
+    return 'W/"' + "-".join(str(part) for part in parts) + '"'
+
+
+def http_date(value: datetime) -> str:
+    # Timestamps are stored as naive UTC
+    return format_datetime(value.replace(tzinfo=timezone.utc), usegmt=True)
+
+
+def is_conditional(request: Request) -> bool:
+    return "if-none-match" in request.headers or "if-modified-since" in request.headers
+
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime] = None) -> bool:
+    """If-None-Match wins when present; If-Modified-Since is only consulted without it."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag_matches(if_none_match, etag)
+    if_modified_since = request.headers.get("if-modified-since")
+    if not if_modified_since or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is not None:
+        since = since.astimezone(timezone.utc).replace(tzinfo=None)
+    # HTTP dates have second precision
+    return last_modified.replace(microsecond=0) <= since
+
+
+def validator_headers(
+    etag: str,
+    last_modified: Optional[datetime] = None,
+    cache_control: Optional[str] = None,
+    extra: Optional[dict] = None,
+) -> dict:
+    headers = {**(extra or {}), "ETag": etag}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified)
+    if cache_control:
+        headers["Cache-Control"] = cache_control
+    return headers
+
+
+def not_modified(headers: dict) -> Response:
+    return Response(status_code=304, headers=headers)
@@ -1,30 +1,45 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
-from ..database import get_db
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..database import get_read_db
 from ..models import User
-from .security import decode_access_token
+from .security import decode_access_token, check_permission
+from .principals import principal_cache, principal_from_user
 
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
-def get_user(db: Session, username: str):
-    return db.query(User).filter(User.username == username).first()
+async def get_user(db: AsyncSession, username: str):
+    result = await db.execute(select(User).where(User.username == username))
+    return result.scalars().first()
 
-def get_user_by_email(db: Session, email: str):
-    return db.query(User).filter(User.email == email).first()
+async def get_user_by_email(db: AsyncSession, email: str):
+    result = await db.execute(select(User).where(User.email == email))
+    return result.scalars().first()
 
-def authenticate_user(db: Session, username: str, password: str):
-    from .security import verify_password
-    user = get_user(db, username)
+async def authenticate_user(db: AsyncSession, username: str, password: str):
+    from .security import verify_and_update_password_async
+    user = await get_user(db, username)
     if not user:
         return False
-    if not verify_password(password, user.hashed_password):
+    verified, new_hash = await verify_and_update_password_async(password, user.hashed_password)
+    if not verified:
         return False
+    if new_hash:
+        # Stored hash used an outdated cost factor
+        from ..utils.writes import write_queue
+
+        async def rehash(write_db: AsyncSession):
+            await write_db.execute(update(User).where(User.id == user.id).values(hashed_password=new_hash))
+
+        await write_queue.submit(rehash)
+        user.hashed_password = new_hash
     return user
 
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security), 
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -39,19 +54,38 @@ async def get_current_user(
     username: str = payload.get("sub")
     if username is None:
         raise credentials_exception
-    
-    user = get_user(db, username=username)
-    if user is None:
+
+    # Cached principals answer most requests without touching the users table
+    token_version = payload.get("pv")
+    principal = principal_cache.get(username)
+    if principal is None or (token_version and principal["pv"] != token_version):
+        user = await get_user(db, username=username)
+        if user is None:
+            raise credentials_exception
+        principal = principal_from_user(user)
+        principal_cache.set(username, principal)
+
+    # Token was issued before the user's permissions or status changed
+    if token_version and principal["pv"] != token_version:
         raise credentials_exception
-    return user
+    if not principal["is_active"]:
+        raise credentials_exception
+    return principal
 
-def check_permission(user: User, required_permission: str):
-    if not user.permissions:
-        return False
-    return required_permission in user.permissions
+async def get_optional_user(
+    credentials: HTTPAuthorizationCredentials = Depends(optional_security),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Principal for public endpoints that behave the same with or without a token."""
+    if credentials is None:
+        return None
+    try:
+        return await get_current_user(credentials, db)
+    except HTTPException:
+        return None
 
 async def get_current_user_with_permission(permission: str):
-    def permission_checker(current_user: User = Depends(get_current_user)):
+    def permission_checker(current_user: dict = Depends(get_current_user)):
         if not check_permission(current_user, permission):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
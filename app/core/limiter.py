@@ -0,0 +1,27 @@
+from fastapi import Request
+from slowapi import Limiter
+from slowapi.util import get_remote_address
+
+from ..config import settings
+from .security import decode_access_token
+
+
+def user_or_ip_key(request: Request) -> str:
+    """Rate-limit authenticated callers per user, everyone else per client address."""
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and token:
+        payload = decode_access_token(token)
+        if payload and payload.get("sub"):
+            return f"user:{payload['sub']}"
+    return get_remote_address(request)
+
+
+# One limiter for the whole app. Counters live in Redis so every worker shares them;
+# if Redis is unreachable slowapi falls back to per-process memory until it recovers.
+limiter = Limiter(
+    key_func=get_remote_address,
+    storage_uri=settings.rate_limit_storage_uri or settings.redis_url,
+    in_memory_fallback_enabled=True,
+    key_prefix="tmsiti",
+    enabled=settings.rate_limit_enabled,
+)
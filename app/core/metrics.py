@@ -0,0 +1,146 @@
+import logging
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Optional
+
+from fastapi.responses import ORJSONResponse
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Time until the response headers are sent",
+    ["method", "route", "status"],
+)
+REQUEST_QUERIES = Histogram(
+    "http_request_db_queries",
+    "SQL statements executed per request",
+    ["method", "route"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100, 250),
+)
+REQUEST_DB_TIME = Histogram(
+    "http_request_db_seconds",
+    "Total time spent in SQL statements per request",
+    ["method", "route"],
+)
+REQUEST_SERIALIZATION_TIME = Histogram(
+    "http_request_serialization_seconds",
+    "Time spent rendering JSON response bodies per request",
+    ["method", "route"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+SLOW_QUERIES = Counter("db_slow_queries_total", "SQL statements slower than slow_query_threshold_ms")
+PASSWORD_HASH_PENDING = Gauge("password_hash_pending", "Password hashes queued or running on the hashing pool")
+PASSWORD_HASH_SECONDS = Histogram(
+    "password_hash_seconds",
+    "Time bcrypt spent on one hash or verification",
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+PASSWORD_HASH_WAIT = Histogram(
+    "password_hash_wait_seconds",
+    "Time a password hash waited for a free pool worker",
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+PASSWORD_HASH_REJECTED = Counter(
+    "password_hash_rejected_total", "Logins and registrations refused because password_hash_queue_limit was reached"
+)
+JOB_QUEUE_DELAY = Histogram(
+    "job_queue_delay_seconds",
+    "Time from a background job being due to a worker starting it",
+    ["kind"],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0),
+)
+JOB_DURATION = Histogram("job_duration_seconds", "Run time of one background job attempt", ["kind", "outcome"])
+
+MAX_LOGGED_PARAMETERS = 1000
+
+
+@dataclass
+class RequestStats:
+    queries: int = 0
+    db_seconds: float = 0.0
+    serialization_seconds: float = 0.0
+
+
+# Mutated in place, so work done in copied contexts (greenlets, task groups) still counts
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def start_request() -> RequestStats:
+    stats = RequestStats()
+    _request_stats.set(stats)
+    return stats
+
+
+def record_serialization(seconds: float) -> None:
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.serialization_seconds += seconds
+
+
+def route_label(request) -> str:
+    # Templated path, so /documents/1 and /documents/2 share one series
+    route = request.scope.get("route")
+    return getattr(route, "path", "unmatched")
+
+
+def observe_request(method: str, route: str, status: int, elapsed: float, stats: RequestStats) -> None:
+    REQUEST_LATENCY.labels(method, route, str(status)).observe(elapsed)
+    REQUEST_QUERIES.labels(method, route).observe(stats.queries)
+    REQUEST_DB_TIME.labels(method, route).observe(stats.db_seconds)
+    REQUEST_SERIALIZATION_TIME.labels(method, route).observe(stats.serialization_seconds)
+    if settings.request_query_warning and stats.queries > settings.request_query_warning:
+        logger.warning("%s %s ran %d SQL statements", method, route, stats.queries)
+
+
+class TimedJSONResponse(ORJSONResponse):
+    """orjson response that adds its render time to the current request's stats."""
+
+    def render(self, content) -> bytes:
+        start = time.perf_counter()
+        body = super().render(content)
+        record_serialization(time.perf_counter() - start)
+        return body
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_seconds += elapsed
+    if settings.slow_query_threshold_ms and elapsed * 1000 >= settings.slow_query_threshold_ms:
+        SLOW_QUERIES.inc()
+        if settings.slow_query_log_parameters:
+            logger.warning(
+                "Slow query (%.1f ms): %s; parameters: %s",
+                elapsed * 1000,
+                statement,
+                repr(parameters)[:MAX_LOGGED_PARAMETERS],
+            )
+        else:
+            logger.warning("Slow query (%.1f ms): %s", elapsed * 1000, statement)
+
+
+def _handle_error(exception_context):
+    # after_cursor_execute does not fire for failed statements
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_start"):
+        connection.info["query_start"].pop()
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Count and time every statement; pass `async_engine.sync_engine` for async engines."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
@@ -0,0 +1,76 @@
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from sqlalchemy import event, inspect
+
+from ..config import settings
+from ..models import User
+
+
+def permission_version(permissions, is_active) -> str:
+    """Short fingerprint of everything that affects authorization."""
+    raw = json.dumps([sorted(permissions or []), bool(is_active)])
+    return hashlib.blake2s(raw.encode(), digest_size=4).hexdigest()
+
+
+def principal_from_user(user: User) -> dict:
+    return {
+        "id": user.id,
+        "username": user.username,
+        "permissions": list(user.permissions or []),
+        "is_active": bool(user.is_active),
+        "pv": permission_version(user.permissions, user.is_active),
+    }
+
+
+class PrincipalCache:
+    """Bounded LRU of resolved principals with a per-entry TTL."""
+
+    def __init__(self, max_size: int, ttl: int):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, username: str) -> Optional[dict]:
+        entry = self._entries.get(username)
+        if entry is None or entry[0] < time.monotonic():
+            self._entries.pop(username, None)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(username)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, username: str, principal: dict) -> None:
+        self._entries[username] = (time.monotonic() + self.ttl, principal)
+        self._entries.move_to_end(username)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, username: str) -> None:
+        self._entries.pop(username, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+principal_cache = PrincipalCache(settings.principal_cache_size, settings.principal_cache_ttl)
+
+
+@event.listens_for(User, "after_update")
+def _invalidate_changed_user(mapper, connection, target: User):
+    state = inspect(target)
+    if any(state.attrs[name].history.has_changes() for name in ("permissions", "is_active", "username")):
+        principal_cache.invalidate(target.username)
+        for old_username in state.attrs.username.history.deleted:
+            principal_cache.invalidate(old_username)
+
+
+@event.listens_for(User, "after_delete")
+def _invalidate_deleted_user(mapper, connection, target: User):
+    principal_cache.invalidate(target.username)
@@ -1,15 +1,235 @@
-from sqlalchemy import create_engine
+import asyncio
+import itertools
+import logging
+from typing import List, Optional
+
+from fastapi import Request
+from sqlalchemy import Delete, Insert, Update, create_engine, event
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 from .config import settings
+from .core.metrics import instrument_engine
+
+logger = logging.getLogger(__name__)
+
+
+def async_database_url(url: str) -> str:
+    """Map a sync database URL onto its async driver (aiosqlite / asyncpg)."""
+    if url.startswith("sqlite://"):
+        return url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    if url.startswith("postgres://"):
+        return url.replace("postgres://", "postgresql+asyncpg://", 1)
+    if url.startswith("postgresql://") or url.startswith("postgresql+psycopg2://"):
+        return "postgresql+asyncpg://" + url.split("://", 1)[1]
+    return url
+
+
+def is_sqlite_file(url: str) -> bool:
+    return url.startswith("sqlite") and ":memory:" not in url
+
+
+def pool_options(url: str) -> dict:
+    # In-memory SQLite lives in a single connection, there is nothing to pool
+    if url.startswith("sqlite") and ":memory:" in url:
+        return {}
+    return {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+
+
+def sqlite_pragmas(read_only: bool = False) -> list:
+    pragmas = [
+        f"PRAGMA journal_mode={settings.sqlite_journal_mode}",
+        f"PRAGMA synchronous={settings.sqlite_synchronous}",
+        f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout)}",
+        f"PRAGMA mmap_size={int(settings.sqlite_mmap_size)}",
+        f"PRAGMA cache_size={int(settings.sqlite_cache_size)}",
+    ]
+    if read_only:
+        # A write reaching a read connection is a bug; fail instead of taking the write lock
+        pragmas.append("PRAGMA query_only=ON")
+    return pragmas
+
+
+def configure_sqlite(engine, read_only: bool = False, immediate: bool = False) -> None:
+    """Apply the SQLite pragmas to every new connection; pass `.sync_engine` for async engines.
 
+    With `immediate`, transactions start with BEGIN IMMEDIATE: the write lock
+    is taken up front, so a transaction that reads before it writes cannot
+    fail with SQLITE_BUSY halfway through. It also makes SAVEPOINTs nest
+    inside the transaction instead of the driver committing around them.
+    """
+    pragmas = sqlite_pragmas(read_only)
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+        if immediate:
+            # Transactions are begun below, not by the driver
+            dbapi_connection.isolation_level = None
+
+    if immediate:
+        @event.listens_for(engine, "begin")
+        def _begin_immediate(connection):
+            connection.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+SQLITE_FILE = is_sqlite_file(settings.database_url)
+# One writer at a time is all SQLite allows; queue writes instead of contending for the lock
+SINGLE_WRITER = SQLITE_FILE if settings.single_writer is None else settings.single_writer
+
+# Sync engine: startup tasks, seeding and command line tools
 engine = create_engine(settings.database_url)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Async engines: request handlers. On SQLite files reads get their own read-only
+# pool and every write goes through the single writer connection
+if SQLITE_FILE:
+    async_engine = create_async_engine(
+        async_database_url(settings.database_url),
+        **{**pool_options(settings.database_url), "pool_size": 1, "max_overflow": 0},
+    )
+    async_read_engine = create_async_engine(
+        async_database_url(settings.database_url),
+        **{**pool_options(settings.database_url), "pool_size": settings.sqlite_read_pool_size, "max_overflow": 0},
+    )
+    configure_sqlite(engine)
+    configure_sqlite(async_engine.sync_engine, immediate=True)
+    configure_sqlite(async_read_engine.sync_engine, read_only=True)
+else:
+    async_engine = create_async_engine(
+        async_database_url(settings.database_url), **pool_options(settings.database_url)
+    )
+    async_read_engine = async_engine
+
+# Read replicas: same schema, possibly behind the primary by the replication lag
+replica_engines: List[AsyncEngine] = []
+for replica_url in settings.database_replica_urls:
+    replica_engine = create_async_engine(async_database_url(replica_url), **pool_options(replica_url))
+    if is_sqlite_file(replica_url):
+        configure_sqlite(replica_engine.sync_engine, read_only=True)
+    replica_engines.append(replica_engine)
+
+
+class RoutingSession(Session):
+    """Reads go to the engine chosen when the session was opened, writes to the primary.
+
+    Read handlers pick a replica through `read_session()`; a flush or an
+    INSERT/UPDATE/DELETE issued on the same session still reaches the primary.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self._flushing or isinstance(clause, (Insert, Update, Delete)):
+            return async_engine.sync_engine
+        return self.info.get("read_engine", async_read_engine).sync_engine
+
+
+class ReplicaSet:
+    """Round-robin over the replicas that passed their last health check.
+
+    A background task runs `SELECT 1` on every replica each
+    replica_health_interval seconds. Replicas start out healthy, so requests
+    are routed before the first check completes.
+    """
+
+    def __init__(self, engines: List[AsyncEngine], interval: float, timeout: float):
+        self.engines = engines
+        self.interval = interval
+        self.timeout = timeout
+        self.healthy = [True] * len(engines)
+        self._turn = itertools.count()
+        self._task: Optional[asyncio.Task] = None
+
+    def pick(self) -> Optional[AsyncEngine]:
+        """Next healthy replica, or None when there is none."""
+        healthy = [engine for engine, ok in zip(self.engines, self.healthy) if ok]
+        if not healthy:
+            return None
+        return healthy[next(self._turn) % len(healthy)]
+
+    async def _ping(self, engine: AsyncEngine):
+        async with engine.connect() as connection:
+            await connection.exec_driver_sql("SELECT 1")
+
+    async def check(self):
+        for index, engine in enumerate(self.engines):
+            try:
+                await asyncio.wait_for(self._ping(engine), timeout=self.timeout)
+                healthy = True
+            except Exception as exc:
+                healthy = False
+                if self.healthy[index]:
+                    logger.warning("Replica %s failed its health check: %r", engine.url.render_as_string(), exc)
+            if healthy and not self.healthy[index]:
+                logger.info("Replica %s is healthy again", engine.url.render_as_string())
+            self.healthy[index] = healthy
+
+    async def start(self):
+        if self.engines:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            await self.check()
+            await asyncio.sleep(self.interval)
+
+
+replicas = ReplicaSet(replica_engines, settings.replica_health_interval, settings.replica_health_timeout)
+
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+ReadSessionLocal = async_sessionmaker(
+    class_=AsyncSession, sync_session_class=RoutingSession, autoflush=False, expire_on_commit=False
+)
+
+
+def read_session(primary: bool = False) -> AsyncSession:
+    """Session for reads: the next healthy replica, or the primary if asked or if none is up."""
+    read_engine = None if primary else replicas.pick()
+    return ReadSessionLocal(info={"read_engine": read_engine or async_read_engine})
+
+
+# Per-request statement counts and slow-query logging
+instrument_engine(engine)
+instrument_engine(async_engine.sync_engine)
+if async_read_engine is not async_engine:
+    instrument_engine(async_read_engine.sync_engine)
+for replica_engine in replica_engines:
+    instrument_engine(replica_engine.sync_engine)
+
+
+
+async def dispose_engines():
+    """Close every async connection; aiosqlite connections otherwise keep the process alive."""
+    for pool in dict.fromkeys([async_engine, async_read_engine, *replica_engines]):
+        await pool.dispose()
+
 Base = declarative_base()
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_read_db(request: Request):
+    """Session for handlers that only read; never holds up the writer.
+
+    Clients that wrote within the last read_primary_seconds carry the
+    read_primary cookie and read from the primary, so they see their own
+    writes whatever the replication lag.
+    """
+    async with read_session(primary=settings.read_primary_cookie in request.cookies) as db:
         yield db
-    finally:
-        db.close()
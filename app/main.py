@@ -1,31 +1,46 @@
-from fastapi import FastAPI, Request
+import time
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.util import get_remote_address
+from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 from datetime import datetime
 
 from .config import settings
-from .database import engine, Base
-from .api import auth, menu, documents
+from .database import dispose_engines, engine, replicas
+from .api import auth, menu, documents, jobs, stats
 from .utils.init_db import init_db
-
-# Create tables
-Base.metadata.create_all(bind=engine)
+from .utils.migrations import check_schema_version, migrate
+from .core.security import HashingBusy, password_hasher
+from .core.limiter import limiter
+from .core.metrics import TimedJSONResponse, observe_request, route_label, start_request
+from .utils.downloads import download_recorder
+from .utils.highlights import highlights
+from .utils.jobs import job_queue
+from .utils.writes import write_queue
+from .utils.profiling import startup_step
 
 # FastAPI app
 app = FastAPI(
     title=settings.project_name,
     description="API для сайта Научно-исследовательского института технического нормирования и стандартизации",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=TimedJSONResponse,
 )
 
 # Rate limiting
-limiter = Limiter(key_func=get_remote_address)
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
+@app.exception_handler(HashingBusy)
+async def hashing_busy_handler(request: Request, exc: HashingBusy):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Authentication service is busy, try again shortly"},
+        headers={"Retry-After": "1"},
+    )
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -41,15 +56,79 @@ app.add_middleware(
     allowed_hosts=settings.allowed_hosts
 )
 
+# Request metrics: latency, SQL statements, DB time and JSON rendering per route
+@app.middleware("http")
+async def metrics_middleware(request: Request, call_next):
+    stats = start_request()
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        observe_request(request.method, route_label(request), status, time.perf_counter() - start, stats)
+
+# Read-your-writes: after a successful write the client reads from the primary
+# until the replicas have caught up
+if settings.database_replica_urls:
+    @app.middleware("http")
+    async def read_primary_middleware(request: Request, call_next):
+        response = await call_next(request)
+        if request.method not in ("GET", "HEAD", "OPTIONS") and response.status_code < 400:
+            response.set_cookie(
+                settings.read_primary_cookie, "1",
+                max_age=settings.read_primary_seconds, httponly=True, samesite="lax",
+            )
+        return response
+
 # Include routers
 app.include_router(auth.router, prefix=f"{settings.api_v1_str}/auth", tags=["authentication"])
 app.include_router(menu.router, prefix=f"{settings.api_v1_str}/menu", tags=["menu"])
+# Before the documents router, whose /{doc_id} routes would otherwise see "stats"
+app.include_router(stats.router, prefix=f"{settings.api_v1_str}/documents/stats", tags=["statistics"])
 app.include_router(documents.router, prefix=f"{settings.api_v1_str}/documents", tags=["documents"])
+app.include_router(jobs.router, prefix=f"{settings.api_v1_str}/jobs", tags=["jobs"])
 
-# Initialize database on startup
+# Schema and seed data are managed by `python -m app.manage migrate|seed`;
+# workers only verify the schema version
 @app.on_event("startup")
 async def startup_event():
-    init_db()
+    if settings.auto_migrate:
+        with startup_step("migrate"):
+            migrate(engine)
+        with startup_step("seed"):
+            init_db()
+    with startup_step("check_schema_version"):
+        check_schema_version(engine)
+    with startup_step("replicas"):
+        await replicas.start()
+    with startup_step("write_queue"):
+        await write_queue.start()
+    with startup_step("download_recorder"):
+        await download_recorder.start()
+    with startup_step("highlights"):
+        await highlights.start()
+    with startup_step("job_queue"):
+        await job_queue.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    # Running jobs record their outcome through the write queue
+    await job_queue.stop()
+    await highlights.stop()
+    # Pending download counts go through the write queue, so stop the recorder first
+    await download_recorder.stop()
+    await write_queue.stop()
+    await replicas.stop()
+    await dispose_engines()
+    password_hasher.shutdown()
+
+if settings.metrics_enabled:
+    @app.get("/metrics", include_in_schema=False)
+    async def metrics():
+        from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+        return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
 
 # Health check
 @app.get("/health")
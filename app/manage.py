@@ -0,0 +1,73 @@
+"""Deployment commands, run once per release rather than in every worker.
+
+    python -m app.manage migrate   # apply Alembic migrations
+    python -m app.manage seed      # insert default users and menu if missing
+    python -m app.manage check     # exit non-zero if the schema is not at head
+    python -m app.manage check-plans  # exit non-zero if a hot query stops using its index
+    python -m app.manage compact-downloads  # apply the download log retention; run daily
+    python -m app.manage rebuild-rollups  # recompute download statistics from download_logs
+    python -m app.manage purge-jobs  # delete background jobs finished before job_retention_days; run daily
+"""
+import argparse
+import sys
+
+from .database import engine
+from .utils.init_db import init_db
+from .utils.migrations import SchemaOutOfDate, check_schema_version, migrate
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.manage")
+    parser.add_argument("command", choices=["migrate", "seed", "check", "check-plans", "compact-downloads", "rebuild-rollups", "purge-jobs"])
+    args = parser.parse_args(argv)
+
+    if args.command == "migrate":
+        migrate(engine)
+        print("Database schema is up to date")
+    elif args.command == "seed":
+        init_db()
+        print("Seed data is in place")
+    elif args.command == "check-plans":
+        from .utils.query_plans import check_query_plans
+
+        with engine.begin() as connection:
+            problems = check_query_plans(connection)
+        for problem in problems:
+            print(f"{problem.query}: {problem.problem}\n{problem.plan}\n", file=sys.stderr)
+        if problems:
+            return 1
+        print("All hot queries use their indexes")
+    elif args.command == "compact-downloads":
+        from .config import settings
+        from .utils.stats import compact_downloads
+
+        with engine.connect() as connection:
+            deleted = compact_downloads(
+                connection, settings.download_log_retention_days, settings.download_hourly_rollup_retention_days
+            )
+        print(f"Deleted {deleted['download_logs']} download log rows and {deleted['hourly_rollups']} hourly rollups")
+    elif args.command == "rebuild-rollups":
+        from .utils.stats import rebuild_download_rollups
+
+        with engine.begin() as connection:
+            rebuild_download_rollups(connection)
+        print("Download rollups rebuilt")
+    elif args.command == "purge-jobs":
+        from .config import settings
+        from .utils.jobs import purge_finished
+
+        with engine.connect() as connection:
+            deleted = purge_finished(connection, settings.job_retention_days)
+        print(f"Deleted {deleted} finished jobs")
+    else:
+        try:
+            check_schema_version(engine)
+        except SchemaOutOfDate as exc:
+            print(exc, file=sys.stderr)
+            return 1
+        print("Database schema is at head")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
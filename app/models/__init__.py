@@ -1,3 +1,6 @@
 from .user import User
 from .menu import MenuItem
-from .document import DocumentCategory, Document , DownloadLog
\ No newline at end of file
+from .document import DocumentCategory, Document , DownloadLog
+from .version import TableVersion
+from .stats import DownloadRollup, DownloadCategoryRollup
+from .job import Job
\ No newline at end of file
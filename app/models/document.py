@@ -1,5 +1,5 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, JSON, Text
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Index, JSON, Text
+from sqlalchemy.orm import relationship, backref
 from datetime import datetime
 from app.database import Base
 
@@ -32,6 +32,18 @@ class Document(Base):
     # Relationships
     creator = relationship("User", back_populates="created_documents")
 
+    # Listing access paths: active documents, optionally narrowed by one filter, keyset-ordered
+    __table_args__ = (
+        Index("ix_documents_active_created", "is_active", "created_at", "id"),
+        Index("ix_documents_active_category_created", "is_active", "category", "created_at", "id"),
+        Index("ix_documents_active_type_created", "is_active", "document_type", "created_at", "id"),
+        Index("ix_documents_active_featured_created", "is_active", "is_featured", "created_at", "id"),
+        # Highlights: most downloaded and newest featured, overall and per type
+        Index("ix_documents_active_downloads", "is_active", "download_count", "id"),
+        Index("ix_documents_active_type_downloads", "is_active", "document_type", "download_count", "id"),
+        Index("ix_documents_active_featured_type_created", "is_active", "is_featured", "document_type", "created_at", "id"),
+    )
+
 
 class DocumentCategory(Base):
     __tablename__ = "document_categories"
@@ -46,14 +58,15 @@ class DocumentCategory(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # Self-referential relationship
-    children = relationship("DocumentCategory", backref="parent", remote_side=[id])
+    children = relationship("DocumentCategory", backref=backref("parent", remote_side=[id]))
 
 
 class DownloadLog(Base):
     __tablename__ = "download_logs"
     
     id = Column(Integer, primary_key=True, index=True)
-    document_id = Column(Integer, ForeignKey("documents.id"))
+    # Logs outlive their document, for the download history
+    document_id = Column(Integer, ForeignKey("documents.id", ondelete="SET NULL"))
     user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
     ip_address = Column(String)
     user_agent = Column(String)
@@ -61,4 +74,11 @@ class DownloadLog(Base):
     
     # Relationships
     document = relationship("Document")
-    user = relationship("User")
\ No newline at end of file
+    user = relationship("User")
+
+    __table_args__ = (
+        # Retention deletes by age
+        Index("ix_download_logs_downloaded_at", "downloaded_at"),
+        # ON DELETE SET NULL when a document is deleted
+        Index("ix_download_logs_document_id", "document_id"),
+    )
\ No newline at end of file
@@ -0,0 +1,27 @@
+from sqlalchemy import Column, Integer, String, DateTime, Index, JSON, Text
+from datetime import datetime
+from ..database import Base
+
+
+class Job(Base):
+    """Durable background job; queued in the same transaction as the write that needs it."""
+    __tablename__ = "jobs"
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String, nullable=False)  # handler name, see app.utils.jobs
+    payload = Column(JSON)
+    status = Column(String, nullable=False, default="queued")  # queued, running, succeeded, failed
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False, default=5)
+    run_after = Column(DateTime, nullable=False, default=datetime.utcnow)  # not claimed before; pushed back by retries
+    locked_until = Column(DateTime)  # lease of the worker running it; expired leases are claimed again
+    last_error = Column(Text)
+    result = Column(JSON)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    started_at = Column(DateTime)  # first attempt
+    finished_at = Column(DateTime)
+
+    __table_args__ = (
+        # Claiming: due jobs in order
+        Index("ix_jobs_status_run_after", "status", "run_after", "id"),
+    )
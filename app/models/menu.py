@@ -1,5 +1,5 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, JSON
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Index, JSON
+from sqlalchemy.orm import relationship, backref
 from datetime import datetime
 from ..database import Base
 
@@ -17,4 +17,11 @@ class MenuItem(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # Self-referential relationship
-    children = relationship("MenuItem", backref="parent", remote_side=[id])
\ No newline at end of file
+    children = relationship("MenuItem", backref=backref("parent", remote_side=[id]))
+
+    __table_args__ = (
+        # Whole active tree (load_tree) and top-level items
+        Index("ix_menu_items_active_parent_order", "is_active", "parent_id", "order"),
+        # Children of one item (load_subtree's recursive step)
+        Index("ix_menu_items_parent_active_order", "parent_id", "is_active", "order"),
+    )
\ No newline at end of file
@@ -0,0 +1,29 @@
+from sqlalchemy import Column, Integer, String, DateTime, Index
+from ..database import Base
+
+
+class DownloadRollup(Base):
+    """Downloads per document per hour or day, maintained as download events are flushed."""
+    __tablename__ = "download_rollups"
+
+    period = Column(String, primary_key=True)  # "hour" or "day"
+    bucket = Column(DateTime, primary_key=True)  # start of the hour/day, UTC
+    document_id = Column(Integer, primary_key=True)  # no foreign key: history outlives deleted documents
+    downloads = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        # Time series of one document
+        Index("ix_download_rollups_document_period_bucket", "document_id", "period", "bucket"),
+    )
+
+
+class DownloadCategoryRollup(Base):
+    """Downloads per document_type and category per hour or day."""
+    __tablename__ = "download_category_rollups"
+
+    period = Column(String, primary_key=True)
+    bucket = Column(DateTime, primary_key=True)
+    # "" rather than NULL: both are part of the primary key
+    document_type = Column(String, primary_key=True, default="")
+    category = Column(String, primary_key=True, default="")
+    downloads = Column(Integer, nullable=False, default=0)
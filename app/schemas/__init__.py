@@ -1,3 +1,5 @@
 from .user import UserCreate, UserResponse, UserLogin, Token
-from .menu import MenuItemCreate, MenuItemResponse
-from .document import DocumentCreate , DocumentUpdate , DocumentResponse , DocumentListResponse , DocumentCategoryBase , DocumentCategoryResponse , DocumentSearchRequest , DownloadLogResponse
\ No newline at end of file
+from .menu import MenuItemCreate, MenuItemResponse, LocalizedMenuItemResponse
+from .document import DocumentCreate , DocumentUpdate , DocumentResponse , LocalizedDocumentResponse , DocumentSummaryResponse , DocumentListResponse , DocumentHighlightsResponse , DocumentImportResponse , DocumentCategoryBase , DocumentCategoryResponse , LocalizedDocumentCategoryResponse , DocumentSearchRequest , DownloadLogResponse
+from .stats import TopDocumentResponse, DownloadPointResponse, DownloadTotalResponse
+from .job import JobResponse
\ No newline at end of file
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Union
 from datetime import datetime
 
 
@@ -49,15 +49,52 @@ class DocumentResponse(DocumentBase):
     created_by: Optional[int] = None
     
     class Config:
-        orm_mode = True
+        from_attributes = True
+
+
+class LocalizedDocumentResponse(DocumentResponse):
+    title: Optional[str] = Field(None, description="Title in the requested language")
+    description: Optional[str] = Field(None, description="Description in the requested language")
+
+
+class DocumentSummaryResponse(BaseModel):
+    id: int
+    title: Union[str, Dict[str, str], None] = Field(None, description="Title in the requested language, every translation with lang=all")
+    document_number: Optional[str] = None
+    document_type: str
+    category: Optional[str] = None
+    issue_date: Optional[datetime] = None
+    effective_date: Optional[datetime] = None
+    file_size: Optional[int] = None
+    file_type: Optional[str] = None
+    download_count: int
+    is_featured: bool
+    created_at: datetime
 
 
 class DocumentListResponse(BaseModel):
-    documents: List[DocumentResponse]
+    documents: List[DocumentSummaryResponse]
     total: int
     page: int
     per_page: int
     pages: int
+    next_cursor: Optional[str] = Field(None, description="Cursor for the next page, if any")
+
+
+class DocumentHighlightsResponse(BaseModel):
+    featured: List[DocumentSummaryResponse] = Field(..., description="Newest featured documents")
+    popular: List[DocumentSummaryResponse] = Field(..., description="Most downloaded documents")
+
+
+class DocumentImportError(BaseModel):
+    line: int
+    errors: List[str]
+
+
+class DocumentImportResponse(BaseModel):
+    imported: int
+    failed: int
+    errors: List[DocumentImportError]
 
 
 class DocumentCategoryBase(BaseModel):
@@ -79,11 +116,20 @@ class DocumentCategoryResponse(DocumentCategoryBase):
     children: List['DocumentCategoryResponse'] = []
     
     class Config:
-        orm_mode = True
+        from_attributes = True
 
 
 # Update forward reference
-DocumentCategoryResponse.update_forward_refs()
+DocumentCategoryResponse.model_rebuild()
+
+
+class LocalizedDocumentCategoryResponse(DocumentCategoryResponse):
+    name: Optional[str] = Field(None, description="Category name in the requested language")
+    description: Optional[str] = Field(None, description="Category description in the requested language")
+    children: List['LocalizedDocumentCategoryResponse'] = []
+
+
+LocalizedDocumentCategoryResponse.model_rebuild()
 
 
 class DocumentSearchRequest(BaseModel):
@@ -91,11 +137,12 @@ class DocumentSearchRequest(BaseModel):
     document_type: Optional[str] = Field(None, description="Filter by document type")
     category: Optional[str] = Field(None, description="Filter by category")
     tags: Optional[List[str]] = Field(None, description="Filter by tags")
-    date_from: Optional[datetime] = Field(None, description="Filter by date from")
-    date_to: Optional[datetime] = Field(None, description="Filter by date to")
+    date_from: Optional[datetime] = Field(None, description="Filter by issue date from")
+    date_to: Optional[datetime] = Field(None, description="Filter by issue date to")
     is_featured: Optional[bool] = Field(None, description="Filter by featured status")
     page: int = Field(1, ge=1, description="Page number")
     per_page: int = Field(20, ge=1, le=100, description="Items per page")
+    cursor: Optional[str] = Field(None, description="Opaque cursor from a previous page; takes precedence over page")
 
 
 class DownloadLogResponse(BaseModel):
@@ -106,4 +153,4 @@ class DownloadLogResponse(BaseModel):
     downloaded_at: datetime
     
     class Config:
-        orm_mode = True
\ No newline at end of file
+        from_attributes = True
\ No newline at end of file
@@ -0,0 +1,22 @@
+from pydantic import BaseModel, Field
+from typing import Any, Optional
+from datetime import datetime
+
+
+class JobResponse(BaseModel):
+    id: int
+    kind: str
+    status: str = Field(..., description="queued, running, succeeded or failed")
+    payload: Optional[Any] = None
+    result: Optional[Any] = None
+    attempts: int
+    max_attempts: int
+    last_error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    run_after: Optional[datetime] = Field(None, description="Next attempt not before; UTC")
+    started_at: Optional[datetime] = Field(None, description="First attempt")
+    finished_at: Optional[datetime] = None
+    latency_seconds: Optional[float] = Field(None, description="From queueing to finishing, or until now if not finished")
+
+    class Config:
+        from_attributes = True
@@ -24,3 +24,10 @@ class MenuItemResponse(MenuItemBase):
 
 # Update forward reference
 MenuItemResponse.model_rebuild()
+
+
+class LocalizedMenuItemResponse(MenuItemResponse):
+    title: Optional[str] = None  # in the requested language
+    children: List['LocalizedMenuItemResponse'] = []
+
+LocalizedMenuItemResponse.model_rebuild()
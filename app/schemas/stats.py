@@ -0,0 +1,23 @@
+from pydantic import BaseModel, Field
+from typing import Optional, Dict, Union
+from datetime import datetime
+
+
+class TopDocumentResponse(BaseModel):
+    document_id: int
+    title: Union[str, Dict[str, str], None] = Field(None, description="Title in the requested language, every translation with lang=all")
+    document_number: Optional[str] = None
+    document_type: Optional[str] = None
+    category: Optional[str] = None
+    downloads: int
+
+
+class DownloadPointResponse(BaseModel):
+    bucket: datetime = Field(..., description="Start of the hour or day, UTC")
+    downloads: int
+
+
+class DownloadTotalResponse(BaseModel):
+    document_type: Optional[str] = None
+    category: Optional[str] = Field(None, description="Only when grouped by category")
+    downloads: int
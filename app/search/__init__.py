@@ -0,0 +1,42 @@
+from sqlalchemy import event, inspect
+from sqlalchemy.engine import Connection
+
+from ..models.document import Document
+from .base import SearchBackend, tokenize
+from .sqlite import SQLiteSearchBackend
+from .postgres import PostgresSearchBackend
+
+_BACKENDS = {
+    "sqlite": SQLiteSearchBackend(),
+    "postgresql": PostgresSearchBackend(),
+}
+
+# Changes to anything else (download_count, is_featured, ...) leave the index alone
+_INDEXED_ATTRIBUTES = ("title", "description", "content", "document_number", "tags")
+
+
+def get_backend(dialect_name: str) -> SearchBackend:
+    try:
+        return _BACKENDS[dialect_name]
+    except KeyError:
+        raise RuntimeError(f"No search backend for database dialect '{dialect_name}'")
+
+
+@event.listens_for(Document, "after_insert")
+def _index_new_document(mapper, connection: Connection, target: Document):
+    get_backend(connection.dialect.name).index(connection, target)
+
+
+@event.listens_for(Document, "after_update")
+def _reindex_document(mapper, connection: Connection, target: Document):
+    state = inspect(target)
+    if any(state.attrs[name].history.has_changes() for name in _INDEXED_ATTRIBUTES):
+        get_backend(connection.dialect.name).index(connection, target)
+
+
+@event.listens_for(Document, "after_delete")
+def _unindex_document(mapper, connection: Connection, target: Document):
+    get_backend(connection.dialect.name).remove(connection, target.id)
+
+
+__all__ = ["SearchBackend", "get_backend", "tokenize"]
@@ -0,0 +1,69 @@
+import re
+from typing import Dict, List, Optional
+
+from sqlalchemy import Integer, Float, select
+from sqlalchemy.engine import Connection
+
+from ..models.document import Document
+from ..utils.i18n import LANGUAGES
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(query: str) -> List[str]:
+    return _TOKEN_RE.findall(query or "")
+
+
+def document_fields(document) -> Dict[str, Optional[str]]:
+    """Flatten a document (ORM object or row mapping) into indexable text fields."""
+    def get(name):
+        if isinstance(document, dict):
+            return document.get(name)
+        return getattr(document, name)
+
+    title = get("title") or {}
+    description = get("description") or {}
+    fields = {}
+    for lang in LANGUAGES:
+        fields[f"title_{lang}"] = title.get(lang)
+        fields[f"description_{lang}"] = description.get(lang)
+    fields["content"] = get("content")
+    fields["document_number"] = get("document_number")
+    fields["tags"] = " ".join(get("tags") or [])
+    return fields
+
+
+SOURCE_COLUMNS = (
+    Document.id, Document.title, Document.description, Document.content,
+    Document.document_number, Document.tags,
+)
+
+
+class SearchBackend:
+    """Keeps a full-text index of documents next to the documents table."""
+
+    def index(self, connection: Connection, document) -> None:
+        raise NotImplementedError
+
+    def remove(self, connection: Connection, document_id: int) -> None:
+        raise NotImplementedError
+
+    def ranked(self, query: str, lang: Optional[str] = None):
+        """Selectable of (document_id, rank) matches; higher rank is better."""
+        raise NotImplementedError
+
+    def rebuild(self, connection: Connection) -> None:
+        rows = connection.execute(select(*SOURCE_COLUMNS)).mappings()
+        for row in rows:
+            self.index(connection, row)
+
+    def reindex(self, connection: Connection, document_ids: List[int]) -> None:
+        rows = connection.execute(
+            select(*SOURCE_COLUMNS).where(Document.id.in_(document_ids))
+        ).mappings()
+        for row in rows:
+            self.index(connection, row)
+
+    @staticmethod
+    def _columns(statement):
+        return statement.columns(document_id=Integer, rank=Float)
@@ -0,0 +1,62 @@
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from .base import LANGUAGES, SearchBackend, document_fields, tokenize
+
+SEARCH_TABLE = "document_search"
+
+# Text search configuration per language; PostgreSQL ships no Uzbek stemmer
+_CONFIGS = {"uz": "simple", "ru": "russian", "en": "english"}
+
+
+def _vector(lang: str) -> str:
+    config = _CONFIGS[lang]
+    return (
+        f"setweight(to_tsvector('{config}', coalesce(:title_{lang}, '')), 'A') || "
+        f"setweight(to_tsvector('simple', coalesce(:document_number, '')), 'A') || "
+        f"setweight(to_tsvector('{config}', coalesce(:description_{lang}, '')), 'B') || "
+        f"setweight(to_tsvector('simple', coalesce(:tags, '')), 'B') || "
+        f"setweight(to_tsvector('{config}', coalesce(:content, '')), 'D')"
+    )
+
+
+class PostgresSearchBackend(SearchBackend):
+    """One weighted tsvector per language in a side table with GIN indexes."""
+
+    def index(self, connection: Connection, document) -> None:
+        document_id = document["id"] if isinstance(document, dict) else document.id
+        vectors = ", ".join(_vector(lang) for lang in LANGUAGES)
+        updates = ", ".join(f"search_{lang} = excluded.search_{lang}" for lang in LANGUAGES)
+        connection.execute(
+            text(
+                f"INSERT INTO {SEARCH_TABLE} (document_id, {', '.join('search_' + l for l in LANGUAGES)}) "
+                f"VALUES (:document_id, {vectors}) "
+                f"ON CONFLICT (document_id) DO UPDATE SET {updates}"
+            ),
+            {"document_id": document_id, **document_fields(document)},
+        )
+
+    def remove(self, connection: Connection, document_id: int) -> None:
+        connection.execute(
+            text(f"DELETE FROM {SEARCH_TABLE} WHERE document_id = :document_id"),
+            {"document_id": document_id},
+        )
+
+    def ranked(self, query: str, lang: Optional[str] = None):
+        tokens = tokenize(query)
+        if not tokens:
+            return None
+        expression = " & ".join(f"{token}:*" for token in tokens)
+        languages = [lang] if lang in LANGUAGES else list(LANGUAGES)
+        matches = " OR ".join(
+            f"search_{l} @@ to_tsquery('{_CONFIGS[l]}', :expression)" for l in languages
+        )
+        ranks = ", ".join(
+            f"ts_rank(search_{l}, to_tsquery('{_CONFIGS[l]}', :expression))" for l in languages
+        )
+        statement = text(
+            f"SELECT document_id, greatest({ranks}) AS rank FROM {SEARCH_TABLE} WHERE {matches}"
+        ).bindparams(expression=expression)
+        return self._columns(statement)
@@ -0,0 +1,55 @@
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from .base import LANGUAGES, SearchBackend, document_fields, tokenize
+
+FTS_TABLE = "documents_fts"
+
+_FIELDS = (
+    [f"title_{lang}" for lang in LANGUAGES]
+    + [f"description_{lang}" for lang in LANGUAGES]
+    + ["content", "document_number", "tags"]
+)
+
+# bm25 weights, in _FIELDS order
+_WEIGHTS = (10.0, 10.0, 10.0, 4.0, 4.0, 4.0, 1.0, 8.0, 5.0)
+
+# Language-neutral fields are searched whatever lang is requested
+_SHARED_FIELDS = ("content", "document_number", "tags")
+
+
+class SQLiteSearchBackend(SearchBackend):
+    """FTS5 index keyed by rowid == documents.id."""
+
+    def index(self, connection: Connection, document) -> None:
+        fields = document_fields(document)
+        document_id = document["id"] if isinstance(document, dict) else document.id
+        self.remove(connection, document_id)
+        connection.execute(
+            text(
+                f"INSERT INTO {FTS_TABLE} (rowid, {', '.join(_FIELDS)}) "
+                f"VALUES (:rowid, {', '.join(':' + name for name in _FIELDS)})"
+            ),
+            {"rowid": document_id, **fields},
+        )
+
+    def remove(self, connection: Connection, document_id: int) -> None:
+        connection.execute(text(f"DELETE FROM {FTS_TABLE} WHERE rowid = :rowid"), {"rowid": document_id})
+
+    def ranked(self, query: str, lang: Optional[str] = None):
+        tokens = tokenize(query)
+        if not tokens:
+            return None
+        # Every token must match, each as a prefix: "O'zMSt 10" -> "O"* AND "zMSt"* AND "10"*
+        expression = " AND ".join(f'"{token}"*' for token in tokens)
+        if lang in LANGUAGES:
+            columns = (f"title_{lang}", f"description_{lang}") + _SHARED_FIELDS
+            expression = "{" + " ".join(columns) + "} : (" + expression + ")"
+        weights = ", ".join(str(weight) for weight in _WEIGHTS)
+        statement = text(
+            f"SELECT rowid AS document_id, -bm25({FTS_TABLE}, {weights}) AS rank "
+            f"FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :expression"
+        ).bindparams(expression=expression)
+        return self._columns(statement)
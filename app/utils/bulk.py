@@ -0,0 +1,243 @@
+"""Bulk import and export of documents as JSONL or CSV.
+
+    python -m app.utils.bulk import archive.jsonl --batch-size 1000
+    python -m app.utils.bulk export --format csv --output documents.csv
+"""
+import argparse
+import csv
+import io
+import json
+import sys
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from ..config import settings
+from ..models.document import Document
+from ..schemas.document import DocumentCreate
+from ..search import get_backend
+from .versions import bump_version
+
+FORMATS = ("jsonl", "csv")
+
+# Columns holding JSON; CSV carries them as JSON-encoded strings
+JSON_COLUMNS = ("title", "description", "tags", "document_metadata")
+
+EXPORT_COLUMNS = (
+    Document.id, Document.title, Document.description, Document.content, Document.document_type,
+    Document.category, Document.document_number, Document.author, Document.issue_date,
+    Document.effective_date, Document.tags, Document.document_metadata, Document.is_featured,
+    Document.is_active, Document.file_path, Document.file_size, Document.file_type,
+    Document.download_count, Document.created_at, Document.updated_at,
+)
+EXPORT_FIELDS = [column.key for column in EXPORT_COLUMNS]
+
+MAX_REPORTED_ERRORS = 1000
+
+
+@dataclass
+class ImportReport:
+    imported: int = 0
+    failed: int = 0
+    errors: List[dict] = field(default_factory=list)
+
+    def fail(self, line: int, messages: List[str]) -> None:
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "errors": messages})
+
+
+def detect_format(filename: Optional[str], declared: Optional[str] = None) -> str:
+    fmt = (declared or (filename or "").rsplit(".", 1)[-1]).lower()
+    if fmt == "ndjson":
+        fmt = "jsonl"
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported format '{fmt}', expected one of {', '.join(FORMATS)}")
+    return fmt
+
+
+def iter_records(lines: Iterable[str], fmt: str) -> Iterator[Tuple[int, Optional[dict], Optional[str]]]:
+    """Yield (line number, record, parse error) without reading the whole input."""
+    if fmt == "jsonl":
+        for line_no, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as exc:
+                yield line_no, None, f"Invalid JSON: {exc}"
+                continue
+            if not isinstance(record, dict):
+                yield line_no, None, "Expected a JSON object"
+                continue
+            yield line_no, record, None
+        return
+
+    reader = csv.DictReader(lines)
+    for row in reader:
+        record = {}
+        try:
+            for key, value in row.items():
+                if key is None or value in (None, ""):
+                    continue
+                record[key] = json.loads(value) if key in JSON_COLUMNS else value
+        except ValueError as exc:
+            yield reader.line_num, None, f"Invalid JSON in column: {exc}"
+            continue
+        yield reader.line_num, record, None
+
+
+def validate_record(record: dict) -> Tuple[Optional[DocumentCreate], List[str]]:
+    try:
+        return DocumentCreate.model_validate(record), []
+    except ValidationError as exc:
+        return None, [
+            f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in exc.errors()
+        ]
+
+
+def insert_batch(db: Session, documents: List[DocumentCreate], created_by: Optional[int] = None) -> List[int]:
+    """Insert validated documents with one executemany and index them for search."""
+    now = datetime.utcnow()
+    rows = [
+        {
+            **document.model_dump(),
+            "created_by": created_by,
+            "is_active": True,
+            "download_count": 0,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for document in documents
+    ]
+    ids = list(db.scalars(insert(Document).returning(Document.id), rows))
+    # Bulk inserts skip mapper events, so the search index is fed explicitly
+    get_backend(db.get_bind().dialect.name).reindex(db.connection(), ids)
+    bump_version(db.connection(), "documents")
+    return ids
+
+
+def import_documents(
+    db: Session,
+    lines: Iterable[str],
+    fmt: str,
+    batch_size: int = settings.import_batch_size,
+    created_by: Optional[int] = None,
+) -> ImportReport:
+    """Validate and insert records, one transaction per batch; bad rows are reported, not fatal."""
+    report = ImportReport()
+    batch: List[Tuple[int, DocumentCreate]] = []
+
+    def flush():
+        try:
+            insert_batch(db, [document for _, document in batch], created_by)
+            db.commit()
+            report.imported += len(batch)
+        except SQLAlchemyError as exc:
+            db.rollback()
+            for line_no, _ in batch:
+                report.fail(line_no, [f"Database error: {getattr(exc, 'orig', None) or exc}"])
+        batch.clear()
+
+    for line_no, record, error in iter_records(lines, fmt):
+        if error:
+            report.fail(line_no, [error])
+            continue
+        document, errors = validate_record(record)
+        if errors:
+            report.fail(line_no, errors)
+            continue
+        batch.append((line_no, document))
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+    return report
+
+
+def _export_value(value, fmt: str):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if fmt == "csv" and isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    return value
+
+
+def export_header(fmt: str) -> str:
+    if fmt != "csv":
+        return ""
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(EXPORT_FIELDS)
+    return buffer.getvalue()
+
+
+def export_line(row, fmt: str) -> str:
+    values = {key: _export_value(row[key], fmt) for key in EXPORT_FIELDS}
+    if fmt == "jsonl":
+        return json.dumps(values, ensure_ascii=False) + "\n"
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow([values[key] for key in EXPORT_FIELDS])
+    return buffer.getvalue()
+
+
+def export_statement():
+    # yield_per makes the driver fetch through a server-side cursor in chunks
+    return (
+        select(*EXPORT_COLUMNS)
+        .order_by(Document.id)
+        .execution_options(yield_per=settings.export_chunk_rows)
+    )
+
+
+def export_documents(db: Session, fmt: str, output) -> int:
+    count = 0
+    output.write(export_header(fmt))
+    for row in db.execute(export_statement()).mappings():
+        output.write(export_line(row, fmt))
+        count += 1
+    return count
+
+
+def main(argv=None):
+    from ..database import SessionLocal
+
+    parser = argparse.ArgumentParser(prog="python -m app.utils.bulk", description="Bulk document import/export")
+    commands = parser.add_subparsers(dest="command", required=True)
+    import_parser = commands.add_parser("import", help="Import documents from a JSONL or CSV file")
+    import_parser.add_argument("path")
+    import_parser.add_argument("--format", choices=FORMATS)
+    import_parser.add_argument("--batch-size", type=int, default=settings.import_batch_size)
+    export_parser = commands.add_parser("export", help="Export all documents")
+    export_parser.add_argument("--format", choices=FORMATS, default="jsonl")
+    export_parser.add_argument("--output", help="Output file (default: stdout)")
+    args = parser.parse_args(argv)
+
+    db = SessionLocal()
+    try:
+        if args.command == "import":
+            fmt = detect_format(args.path, args.format)
+            with open(args.path, encoding="utf-8-sig", newline="") as source:
+                report = import_documents(db, source, fmt, args.batch_size)
+            for error in report.errors:
+                print(f"line {error['line']}: {'; '.join(error['errors'])}", file=sys.stderr)
+            print(f"Imported {report.imported} documents, {report.failed} failed")
+            return 1 if report.failed else 0
+        output = open(args.output, "w", encoding="utf-8", newline="") if args.output else sys.stdout
+        try:
+            count = export_documents(db, args.format, output)
+        finally:
+            if args.output:
+                output.close()
+        print(f"Exported {count} documents", file=sys.stderr)
+        return 0
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,171 @@
+import asyncio
+import logging
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+
+from sqlalchemy import bindparam, func, insert, select, update
+
+from ..config import settings
+from ..models.document import Document, DownloadLog
+from .highlights import highlights
+from .stats import record_rollups
+from ..models.version import TableVersion
+from .versions import DOWNLOADS_VERSION, version_bump
+from .writes import write_queue
+
+logger = logging.getLogger(__name__)
+
+
+def resolve_media_path(file_path: str) -> Optional[Path]:
+    """Absolute path of a stored file, or None if it would escape media_root."""
+    root = Path(settings.media_root).resolve()
+    path = (root / file_path).resolve()
+    if root not in path.parents:
+        return None
+    return path
+
+
+class DownloadRecorder:
+    """Buffers download events and writes them in batches.
+
+    Each flush is one job on the write queue: a multi-row insert into
+    download_logs, one executemany UPDATE of documents.download_count per
+    distinct document and the increments of the statistics rollups. Events
+    of documents deleted since they were recorded are dropped.
+
+    Flushes do not bump the documents version: that would change every
+    listing ETag and reload every worker's highlights once per flush. The
+    separate document_downloads version is bumped instead, at most once per
+    publish_interval and only if no worker has bumped it since this one's
+    unpublished counts were committed.
+    """
+
+    def __init__(self, flush_interval: float, batch_size: int, publish_interval: float):
+        self.flush_interval = flush_interval
+        self.publish_interval = publish_interval
+        self.batch_size = batch_size
+        self.max_pending = batch_size * 20
+        self._pending: List[dict] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        # Commit time of the oldest flush not yet covered by a document_downloads bump
+        self._unpublished_since: Optional[datetime] = None
+        self.flushed = 0
+        self.dropped = 0
+
+    def record(self, document_id: int, user_id: Optional[int], ip_address: Optional[str], user_agent: Optional[str]):
+        if len(self._pending) >= self.max_pending:
+            self.dropped += 1
+            return
+        self._pending.append({
+            "document_id": document_id,
+            "user_id": user_id,
+            "ip_address": ip_address,
+            "user_agent": user_agent,
+            "downloaded_at": datetime.utcnow(),
+        })
+        if len(self._pending) >= self.batch_size and self._wakeup is not None:
+            self._wakeup.set()
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    async def start(self):
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+        await self.publish(force=True)
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+            await self.publish()
+
+    async def flush(self):
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        counts = Counter(event["document_id"] for event in batch)
+        documents = Document.__table__
+        increment = (
+            update(documents)
+            .where(documents.c.id == bindparam("document"))
+            .values(
+                download_count=func.coalesce(documents.c.download_count, 0) + bindparam("downloads"),
+                # A download is not an edit: keep the onupdate default off updated_at
+                updated_at=documents.c.updated_at,
+            )
+        )
+
+        async def write(db):
+            # Downloads recorded just before their document was deleted would break the foreign
+            # key; FOR KEY SHARE (PostgreSQL) holds off a delete until this batch commits
+            existing = set(await db.scalars(
+                select(Document.id).where(Document.id.in_(counts)).with_for_update(key_share=True)
+            ))
+            events = [event for event in batch if event["document_id"] in existing]
+            if not events:
+                return
+            await db.execute(insert(DownloadLog.__table__), events)
+            await db.execute(increment, [
+                {"document": document_id, "downloads": downloads}
+                for document_id, downloads in counts.items()
+                if document_id in existing
+            ])
+            await record_rollups(db, events)
+
+        try:
+            await write_queue.submit(write)
+        except Exception:
+            logger.exception("Failed to write %d download events", len(batch))
+            # Keep the events for the next flush unless the buffer is already full
+            room = self.max_pending - len(self._pending)
+            self._pending[:0] = batch[:room]
+            self.dropped += max(0, len(batch) - room)
+            return
+        self.flushed += len(batch)
+        if self._unpublished_since is None:
+            self._unpublished_since = datetime.utcnow()
+        highlights.record_downloads(counts)
+
+    async def publish(self, force: bool = False):
+        """Bump the document_downloads version once flushed counts are publish_interval old."""
+        since = self._unpublished_since
+        if since is None:
+            return
+        if not force and (datetime.utcnow() - since).total_seconds() < self.publish_interval:
+            return
+
+        async def bump(db):
+            # A bump by any worker after `since` already covers these counts
+            await db.execute(version_bump(DOWNLOADS_VERSION).where(TableVersion.updated_at <= since))
+
+        try:
+            await write_queue.submit(bump)
+        except Exception:
+            logger.exception("Failed to publish download counts; retrying at the next flush")
+            return
+        if self._unpublished_since == since:
+            self._unpublished_since = None
+
+
+download_recorder = DownloadRecorder(
+    settings.download_flush_interval, settings.download_flush_batch_size, settings.download_count_publish_interval
+)
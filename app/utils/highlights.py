@@ -0,0 +1,224 @@
+"""In-process ranked lists for the homepage highlights.
+
+Each worker keeps, per document_type and across all types, the newest
+featured documents and the most downloaded ones as sorted lists of at most
+highlights_size entries. GET /api/documents/highlights slices them without
+touching the database.
+
+The lists are loaded at startup. This worker's own document writes and
+download flushes are applied to them right away. Every
+highlights_refresh_interval seconds the `documents` and
+`document_downloads` versions are read; if either moved (a write on any
+worker, or download counts published at most every
+download_count_publish_interval), or a removal left a list shorter than it
+should be, the lists are reloaded through the ix_documents_active_*
+indexes, highlights_size rows per list.
+"""
+import asyncio
+import logging
+from bisect import insort
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select
+
+from ..config import settings
+from ..database import read_session
+from ..models.document import Document
+from ..schemas.document import DocumentSummaryResponse
+from .versions import DOWNLOADS_VERSION, read_versions
+
+logger = logging.getLogger(__name__)
+
+EPOCH = datetime(1970, 1, 1)
+FEATURED = "featured"
+POPULAR = "popular"
+
+# Exactly the columns of DocumentSummaryResponse, every translation of the title
+HIGHLIGHT_COLUMNS = tuple(Document.__table__.c[name] for name in DocumentSummaryResponse.model_fields)
+
+
+def _popular_key(entry: dict) -> tuple:
+    return (-entry["download_count"], -entry["id"])
+
+
+def _featured_key(entry: dict) -> tuple:
+    created_at = entry["created_at"] or datetime.min
+    return (-(created_at - EPOCH).total_seconds(), -entry["id"])
+
+
+RANKINGS: Dict[str, Callable[[dict], tuple]] = {FEATURED: _featured_key, POPULAR: _popular_key}
+
+
+def qualifies(ranking: str, entry: dict) -> bool:
+    return bool(entry["is_active"]) and (ranking != FEATURED or bool(entry["is_featured"]))
+
+
+class RankedList:
+    """Best-first entries, at most `capacity` of them.
+
+    The list always holds the true top len(list) documents, or all of them if
+    `complete`. An entry that ranks below the last one is dropped unless the
+    list is complete: documents outside the list may rank between them.
+    """
+
+    def __init__(self, key: Callable[[dict], tuple], capacity: int, entries: Iterable[dict] = (), complete: bool = False):
+        self.key = key
+        self.capacity = capacity
+        self.complete = complete
+        self._items: List[Tuple[tuple, dict]] = sorted((key(entry), entry) for entry in entries)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def top(self, limit: int) -> List[dict]:
+        return [entry for _, entry in self._items[:limit]]
+
+    def discard(self, document_id: int) -> bool:
+        for index, (_, entry) in enumerate(self._items):
+            if entry["id"] == document_id:
+                del self._items[index]
+                return True
+        return False
+
+    def add(self, entry: dict, member: bool = False) -> None:
+        """Insert `entry`; `member` means it was in the list before and ranks no worse now."""
+        item = (self.key(entry), entry)
+        if not (member or self.complete) and self._items and item > self._items[-1]:
+            return
+        insort(self._items, item)
+        if len(self._items) > self.capacity:
+            self._items.pop()
+            self.complete = False
+
+
+class HighlightIndex:
+    def __init__(self, size: int, refresh_interval: float):
+        self.size = size
+        self.refresh_interval = refresh_interval
+        # (ranking, document_type or None for all types) -> list; replaced wholesale on reload
+        self.lists: Dict[Tuple[str, Optional[str]], RankedList] = {}
+        self.version: Optional[tuple] = None  # (documents, document_downloads) versions
+        self.stale = True
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def top(self, ranking: str, document_type: Optional[str], limit: int) -> List[dict]:
+        ranked = self.lists.get((ranking, document_type))
+        if ranked is None:
+            return []
+        if len(ranked) < limit and not ranked.complete:
+            # Removals ate into the list; serve what is left until the next reload
+            self.stale = True
+        return ranked.top(limit)
+
+    async def ensure_loaded(self):
+        if self.version is None:
+            await self.reload()
+
+    async def reload(self):
+        async with self._lock:
+            async with read_session() as db:
+                # Version first: a write racing the load moves it again and triggers another reload
+                version = tuple(version for version, _ in await read_versions(db, "documents", DOWNLOADS_VERSION))
+                document_types = list(await db.scalars(
+                    select(Document.document_type).where(Document.is_active == True).distinct()
+                ))
+                lists = {}
+                for document_type in [None, *document_types]:
+                    for ranking in RANKINGS:
+                        rows = (await db.execute(self.query(ranking, document_type))).mappings().all()
+                        entries = [self._entry(row) for row in rows]
+                        lists[ranking, document_type] = RankedList(
+                            RANKINGS[ranking], self.size, entries, complete=len(entries) < self.size
+                        )
+            self.lists = lists
+            self.version = version
+            self.stale = False
+
+    def query(self, ranking: str, document_type: Optional[str]):
+        """The top highlights_size documents of one list, straight off an index."""
+        statement = select(*HIGHLIGHT_COLUMNS, Document.is_active).where(Document.is_active == True)
+        if document_type is not None:
+            statement = statement.where(Document.document_type == document_type)
+        if ranking == FEATURED:
+            statement = statement.where(Document.is_featured == True).order_by(
+                Document.created_at.desc(), Document.id.desc()
+            )
+        else:
+            statement = statement.order_by(Document.download_count.desc(), Document.id.desc())
+        return statement.limit(self.size)
+
+    @staticmethod
+    def _entry(row) -> dict:
+        entry = dict(row)
+        entry["download_count"] = entry["download_count"] or 0
+        entry["is_featured"] = bool(entry["is_featured"])
+        return entry
+
+    # Incremental updates from this worker's own writes
+
+    def remove(self, document_id: int) -> None:
+        for ranked in self.lists.values():
+            ranked.discard(document_id)
+
+    def upsert(self, document) -> None:
+        """Place a created or updated Document in every list it belongs to."""
+        entry = self._entry({
+            **{column.key: getattr(document, column.key) for column in HIGHLIGHT_COLUMNS},
+            "is_active": document.is_active,
+        })
+        members = {position for position, ranked in self.lists.items() if ranked.discard(entry["id"])}
+        for document_type in (None, entry["document_type"]):
+            for ranking, key in RANKINGS.items():
+                if not qualifies(ranking, entry):
+                    continue
+                ranked = self.lists.get((ranking, document_type))
+                if ranked is None:
+                    # First document of a new type
+                    ranked = self.lists[ranking, document_type] = RankedList(key, self.size, complete=True)
+                # Edits change neither download_count nor created_at, so a member keeps its place
+                ranked.add(dict(entry), member=(ranking, document_type) in members)
+
+    def record_downloads(self, counts: Dict[int, int]) -> None:
+        """Apply flushed download counts to the documents already in the popular lists."""
+        for (ranking, _), ranked in self.lists.items():
+            if ranking != POPULAR:
+                continue
+            for entry in ranked.top(len(ranked)):
+                if entry["id"] in counts:
+                    ranked.discard(entry["id"])
+                    ranked.add({**entry, "download_count": entry["download_count"] + counts[entry["id"]]}, member=True)
+
+    # Cross-worker refresh
+
+    async def start(self):
+        await self.reload()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def refresh(self):
+        """Reload if another write happened since the last load: one query over two primary keys otherwise."""
+        async with read_session() as db:
+            version = tuple(version for version, _ in await read_versions(db, "documents", DOWNLOADS_VERSION))
+        if self.stale or version != self.version:
+            await self.reload()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            try:
+                await self.refresh()
+            except Exception:
+                logger.exception("Failed to refresh the highlights index")
+
+
+highlights = HighlightIndex(settings.highlights_size, settings.highlights_refresh_interval)
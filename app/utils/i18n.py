@@ -0,0 +1,74 @@
+from typing import Dict, List, Optional
+
+from fastapi import Query, Request
+from sqlalchemy import func
+
+LANGUAGES = ("uz", "ru", "en")
+DEFAULT_LANGUAGE = "uz"
+# lang=all returns every translation, e.g. for editing forms
+ALL_LANGUAGES = "all"
+# Sent with every response whose language may come from Accept-Language
+VARY_LANGUAGE = {"Vary": "Accept-Language"}
+
+
+def fallback_chain(lang: str) -> List[str]:
+    """Requested language first, then the default, then the rest: ru -> uz -> en."""
+    chain = [lang, DEFAULT_LANGUAGE] + list(LANGUAGES)
+    return list(dict.fromkeys(code for code in chain if code in LANGUAGES))
+
+
+def localize(value: Optional[Dict[str, str]], lang: str) -> Optional[str]:
+    if not value:
+        return None
+    for code in fallback_chain(lang):
+        if value.get(code):
+            return value[code]
+    return next(iter(value.values()), None)
+
+
+def localized_column(column, lang: str):
+    """SQL expression picking one translation out of a JSON column.
+
+    JSON_EXTRACT on SQLite, ->> on PostgreSQL; the other translations are
+    never sent over the wire.
+    """
+    return func.coalesce(*(func.nullif(column[code].as_string(), "") for code in fallback_chain(lang)))
+
+
+def negotiate_language(accept_language: Optional[str]) -> Optional[str]:
+    """Best supported language from an Accept-Language header, by q-value."""
+    best, best_q = None, 0.0
+    for part in (accept_language or "").split(","):
+        tag, _, params = part.strip().partition(";")
+        code = tag.strip().split("-")[0].lower()
+        if code not in LANGUAGES:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                continue
+        if q > best_q:
+            best, best_q = code, q
+    return best
+
+
+def get_language(
+    request: Request,
+    lang: Optional[str] = Query(None, pattern="^(uz|ru|en|all)$", description="Language, or 'all' for every translation"),
+) -> str:
+    """Explicit ?lang= wins, then Accept-Language, then the default language.
+
+    Responses built with this dependency must send `Vary: Accept-Language`.
+    """
+    return lang or negotiate_language(request.headers.get("accept-language")) or DEFAULT_LANGUAGE
+
+
+def projected(column, lang: str):
+    """The column itself for lang=all, otherwise its localized value under the same name."""
+    if lang == ALL_LANGUAGES:
+        return column
+    return localized_column(column, lang).label(column.key)
+
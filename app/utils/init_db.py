@@ -1,130 +1,151 @@
+from sqlalchemy import insert, select
 from sqlalchemy.orm import Session
 from ..models.user import User
 from ..models.menu import MenuItem
 from ..core.security import get_password_hash
 from ..database import SessionLocal
+from .sql import upsert
+from .versions import VERSIONED_TABLES, version_bump
 
-def init_db():
-    db = SessionLocal()
-    
-    if not db.query(User).filter(User.username == "admin").first():
-        admin_user = User(
-            username="admin",
-            email="admin@tmsiti.uz",
-            hashed_password=get_password_hash("admin123"),
-            permissions=["read", "write", "delete", "manage_users"]
-        )
-        db.add(admin_user)
-    
-    if not db.query(User).filter(User.username == "editor").first():
-        editor_user = User(
-            username="editor",
-            email="editor@tmsiti.uz",
-            hashed_password=get_password_hash("editor123"),
-            permissions=["read", "write"]
+SEED_USERS = [
+    {
+        "username": "admin",
+        "email": "admin@tmsiti.uz",
+        "password": "admin123",
+        "permissions": ["read", "write", "delete", "manage_users"],
+    },
+    {
+        "username": "editor",
+        "email": "editor@tmsiti.uz",
+        "password": "editor123",
+        "permissions": ["read", "write"],
+    },
+]
+
+SEED_MENU = [
+    {
+        "title": {"uz": "Institut", "ru": "Институт", "en": "Institute"},
+        "url": "/institut",
+        "icon": "building",
+        "order": 1,
+        "children": [
+            {
+                "title": {"uz": "Institut haqida", "ru": "Об институте", "en": "About Institute"},
+                "url": "/institut/about",
+                "icon": "info",
+                "order": 1,
+            },
+            {
+                "title": {"uz": "Rahbariyat", "ru": "Руководство", "en": "Leadership"},
+                "url": "/institut/leadership",
+                "icon": "users",
+                "order": 2,
+            },
+            {
+                "title": {"uz": "Tashkiliy tuzilma", "ru": "Организационная структура", "en": "Organizational Structure"},
+                "url": "/institut/structure",
+                "icon": "sitemap",
+                "order": 3,
+            },
+        ],
+    },
+    {
+        "title": {"uz": "Me'yoriy hujjatlar", "ru": "Нормативные документы", "en": "Regulatory Documents"},
+        "url": "/documents",
+        "icon": "file-text",
+        "order": 2,
+        "children": [
+            {
+                "title": {"uz": "Qonun, qaror va farmonlar", "ru": "Законы, постановления и указы", "en": "Laws, Resolutions and Decrees"},
+                "url": "/documents/laws",
+                "icon": "gavel",
+                "order": 1,
+            },
+            {
+                "title": {"uz": "Shaharsozlik normalari va qoidalari", "ru": "Градостроительные нормы и правила", "en": "Urban Planning Standards"},
+                "url": "/documents/urban-planning",
+                "icon": "city",
+                "order": 2,
+            },
+            {
+                "title": {"uz": "Standartlar", "ru": "Стандарты", "en": "Standards"},
+                "url": "/documents/standards",
+                "icon": "check-circle",
+                "order": 3,
+            },
+        ],
+    },
+    {
+        "title": {"uz": "Faoliyat", "ru": "Деятельность", "en": "Activities"},
+        "url": "/activities",
+        "icon": "briefcase",
+        "order": 3,
+    },
+    {
+        "title": {"uz": "Xabarlar", "ru": "Новости", "en": "News"},
+        "url": "/news",
+        "icon": "newspaper",
+        "order": 4,
+    },
+    {
+        "title": {"uz": "Bog'lanish", "ru": "Контакты", "en": "Contacts"},
+        "url": "/contacts",
+        "icon": "phone",
+        "order": 5,
+    },
+]
+
+
+def _menu_row(item: dict, parent_id=None) -> dict:
+    return {
+        "title": item["title"],
+        "url": item["url"],
+        "icon": item["icon"],
+        "order": item["order"],
+        "parent_id": parent_id,
+        "permissions": ["read"],
+    }
+
+
+def seed(db: Session):
+    """Insert default users and menu in one transaction; safe to run repeatedly."""
+    usernames = [user["username"] for user in SEED_USERS]
+    existing = set(db.scalars(select(User.username).where(User.username.in_(usernames))))
+    # Only hash passwords for accounts that are actually missing
+    users = [
+        {
+            "username": user["username"],
+            "email": user["email"],
+            "hashed_password": get_password_hash(user["password"]),
+            "permissions": user["permissions"],
+        }
+        for user in SEED_USERS
+        if user["username"] not in existing
+    ]
+    if users:
+        statement = upsert(db.get_bind().dialect.name, User.__table__).on_conflict_do_nothing()
+        db.execute(statement, users)
+
+    if db.scalar(select(MenuItem.id).limit(1)) is None:
+        parent_ids = dict(
+            db.execute(
+                insert(MenuItem).returning(MenuItem.url, MenuItem.id),
+                [_menu_row(item) for item in SEED_MENU],
+            ).all()
         )
-        db.add(editor_user)
-    
-    if not db.query(MenuItem).first():
-        menu_items = [
-            MenuItem(
-                title={"uz": "Institut", "ru": "Институт", "en": "Institute"},
-                url="/institut",
-                icon="building",
-                order=1,
-                permissions=["read"]
-            ),
-            MenuItem(
-                title={"uz": "Me'yoriy hujjatlar", "ru": "Нормативные документы", "en": "Regulatory Documents"},
-                url="/documents",
-                icon="file-text",
-                order=2,
-                permissions=["read"]
-            ),
-            MenuItem(
-                title={"uz": "Faoliyat", "ru": "Деятельность", "en": "Activities"},
-                url="/activities",
-                icon="briefcase",
-                order=3,
-                permissions=["read"]
-            ),
-            MenuItem(
-                title={"uz": "Xabarlar", "ru": "Новости", "en": "News"},
-                url="/news",
-                icon="newspaper",
-                order=4,
-                permissions=["read"]
-            ),
-            MenuItem(
-                title={"uz": "Bog'lanish", "ru": "Контакты", "en": "Contacts"},
-                url="/contacts",
-                icon="phone",
-                order=5,
-                permissions=["read"]
-            )
-        ]
-        
-        for item in menu_items:
-            db.add(item)
-            
-        db.commit()
-        
-        institut_id = db.query(MenuItem).filter(MenuItem.url == "/institut").first().id
-        documents_id = db.query(MenuItem).filter(MenuItem.url == "/documents").first().id
-        
-        submenus = [
-            MenuItem(
-                title={"uz": "Institut haqida", "ru": "Об институте", "en": "About Institute"},
-                url="/institut/about",
-                icon="info",
-                order=1,
-                parent_id=institut_id,
-                permissions=["read"]
-            ),
-            MenuItem(
-                title={"uz": "Rahbariyat", "ru": "Руководство", "en": "Leadership"},
-                url="/institut/leadership",
-                icon="users",
-                order=2,
-                parent_id=institut_id,
-                permissions=["read"]
-            ),
-            MenuItem(
-                title={"uz": "Tashkiliy tuzilma", "ru": "Организационная структура", "en": "Organizational Structure"},
-                url="/institut/structure",
-                icon="sitemap",
-                order=3,
-                parent_id=institut_id,
-                permissions=["read"]
-            ),
-            MenuItem(
-                title={"uz": "Qonun, qaror va farmonlar", "ru": "Законы, постановления и указы", "en": "Laws, Resolutions and Decrees"},
-                url="/documents/laws",
-                icon="gavel",
-                order=1,
-                parent_id=documents_id,
-                permissions=["read"]
-            ),
-            MenuItem(
-                title={"uz": "Shaharsozlik normalari va qoidalari", "ru": "Градостроительные нормы и правила", "en": "Urban Planning Standards"},
-                url="/documents/urban-planning",
-                icon="city",
-                order=2,
-                parent_id=documents_id,
-                permissions=["read"]
-            ),
-            MenuItem(
-                title={"uz": "Standartlar", "ru": "Стандарты", "en": "Standards"},
-                url="/documents/standards",
-                icon="check-circle",
-                order=3,
-                parent_id=documents_id,
-                permissions=["read"]
-            )
+        children = [
+            _menu_row(child, parent_ids[item["url"]])
+            for item in SEED_MENU
+            for child in item.get("children", [])
         ]
-        
-        for item in submenus:
-            db.add(item)
-    
+        db.execute(insert(MenuItem), children)
+
+    # Core inserts skip the ORM version listener. A re-seed usually follows a restore
+    # or reset, so running workers must drop every version-keyed ETag and cached body
+    db.execute(version_bump(*VERSIONED_TABLES))
     db.commit()
-    db.close()
\ No newline at end of file
+
+
+def init_db():
+    with SessionLocal() as db:
+        seed(db)
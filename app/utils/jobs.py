@@ -0,0 +1,223 @@
+"""Durable background jobs for post-write side effects.
+
+A write endpoint calls `enqueue(db, kind, payload)` inside its write-queue
+job, so the jobs row commits atomically with the change that needs it, and
+calls `job_queue.wake()` once the commit is done. Every worker runs a
+JobQueue: it claims due jobs with a lease (UPDATE ... RETURNING, FOR UPDATE
+SKIP LOCKED on PostgreSQL), runs at most job_concurrency of them at once and
+records the outcome. Failures are retried with exponential backoff until
+max_attempts. A job whose worker died is claimed again once its lease
+expires, so handlers must be safe to run more than once.
+
+Handlers are registered with @job_handler("kind") (see app.utils.tasks),
+take the payload dict and return a JSON-serializable result.
+"""
+import asyncio
+import logging
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from sqlalchemy import and_, delete, func, or_, select, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import settings
+from ..core.metrics import JOB_DURATION, JOB_QUEUE_DELAY
+from ..database import read_session
+from ..models.job import Job
+from .writes import write_queue
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+MAX_ERROR_LENGTH = 2000
+
+HANDLERS: Dict[str, Callable[[dict], Awaitable[Any]]] = {}
+
+
+class PermanentJobError(Exception):
+    """Raised by a handler when retrying cannot help; the job fails at once."""
+
+
+def job_handler(kind: str):
+    def register(handler):
+        HANDLERS[kind] = handler
+        return handler
+    return register
+
+
+def enqueue(db: AsyncSession, kind: str, payload: dict, delay: float = 0, max_attempts: Optional[int] = None) -> Job:
+    """Add a job to the caller's transaction; workers see it once that commits."""
+    if kind not in HANDLERS:
+        raise ValueError(f"Unknown job kind '{kind}'")
+    now = datetime.utcnow()
+    job = Job(
+        kind=kind,
+        payload=payload,
+        status=QUEUED,
+        attempts=0,
+        max_attempts=max_attempts or settings.job_max_attempts,
+        run_after=now + timedelta(seconds=delay),
+        created_at=now,
+    )
+    db.add(job)
+    return job
+
+
+def retry_delay(attempts: int) -> float:
+    """Exponential backoff with jitter, so failed jobs do not retry in lockstep."""
+    delay = min(settings.job_retry_max_delay, settings.job_retry_base_delay * 2 ** (attempts - 1))
+    return delay * random.uniform(0.5, 1.0)
+
+
+def due_query(now: datetime):
+    """Jobs that may be claimed now, through ix_jobs_status_run_after."""
+    return select(Job.id).where(or_(
+        and_(Job.status == QUEUED, Job.run_after <= now),
+        # The worker holding the lease is gone
+        and_(Job.status == RUNNING, Job.locked_until < now),
+    ))
+
+
+class JobQueue:
+    def __init__(self, concurrency: int, poll_interval: float, lease_seconds: int):
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._running: Set[asyncio.Task] = set()
+
+    def wake(self):
+        """Check for due jobs now rather than at the next poll."""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def start(self):
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self, timeout: float = 10.0):
+        """Stop claiming and give running jobs `timeout` seconds; the rest are retried after their lease."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._running:
+            await asyncio.wait(self._running, timeout=timeout)
+        for task in list(self._running):
+            task.cancel()
+        self._wakeup = None
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self._dispatch()
+            except Exception:
+                logger.exception("Failed to claim background jobs")
+
+    async def _dispatch(self):
+        free = self.concurrency - len(self._running)
+        if free <= 0:
+            return
+        # Idle polls stay reads; only a due job costs a write transaction
+        async with read_session(primary=True) as db:
+            if await db.scalar(due_query(datetime.utcnow()).limit(1)) is None:
+                return
+        for job in await write_queue.submit(lambda db: self._claim(db, free)):
+            task = asyncio.create_task(self._execute(job))
+            self._running.add(task)
+            task.add_done_callback(self._finished)
+
+    def _finished(self, task: asyncio.Task):
+        self._running.discard(task)
+        # A slot is free; more jobs may be due
+        self.wake()
+
+    async def _claim(self, db: AsyncSession, limit: int) -> List[Any]:
+        now = datetime.utcnow()
+        jobs = Job.__table__
+        due = (
+            due_query(now)
+            .order_by(jobs.c.run_after, jobs.c.id)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        return (await db.execute(
+            update(jobs)
+            .where(jobs.c.id.in_(due.scalar_subquery()))
+            .values(
+                status=RUNNING,
+                attempts=jobs.c.attempts + 1,
+                locked_until=now + timedelta(seconds=self.lease_seconds),
+                started_at=func.coalesce(jobs.c.started_at, now),
+            )
+            .returning(jobs.c.id, jobs.c.kind, jobs.c.payload, jobs.c.attempts, jobs.c.max_attempts, jobs.c.run_after)
+        )).all()
+
+    async def _execute(self, job):
+        JOB_QUEUE_DELAY.labels(job.kind).observe(max(0.0, (datetime.utcnow() - job.run_after).total_seconds()))
+        start = time.perf_counter()
+        try:
+            handler = HANDLERS.get(job.kind)
+            if handler is None:
+                raise PermanentJobError(f"No handler for job kind '{job.kind}'")
+            # Finish within the lease, or another worker would start it again
+            result = await asyncio.wait_for(handler(job.payload or {}), timeout=self.lease_seconds)
+        except Exception as exc:
+            JOB_DURATION.labels(job.kind, "error").observe(time.perf_counter() - start)
+            await self._record_failure(job, exc)
+        else:
+            JOB_DURATION.labels(job.kind, "success").observe(time.perf_counter() - start)
+            await self._record(job.id, status=SUCCEEDED, result=result, last_error=None, finished_at=datetime.utcnow())
+
+    async def _record_failure(self, job, exc: Exception):
+        error = f"{type(exc).__name__}: {exc}"[:MAX_ERROR_LENGTH]
+        if isinstance(exc, PermanentJobError) or job.attempts >= job.max_attempts:
+            logger.error("Job %d (%s) failed after %d attempt(s): %s", job.id, job.kind, job.attempts, error)
+            await self._record(job.id, status=FAILED, last_error=error, finished_at=datetime.utcnow())
+            return
+        delay = retry_delay(job.attempts)
+        logger.warning("Job %d (%s) attempt %d failed, retrying in %.1f s: %s", job.id, job.kind, job.attempts, delay, error)
+        await self._record(
+            job.id, status=QUEUED, last_error=error, run_after=datetime.utcnow() + timedelta(seconds=delay)
+        )
+        # Short backoffs would otherwise wait for the next poll
+        asyncio.get_running_loop().call_later(delay, self.wake)
+
+    async def _record(self, job_id: int, **values):
+        async def write(db: AsyncSession):
+            await db.execute(update(Job.__table__).where(Job.id == job_id).values(locked_until=None, **values))
+
+        try:
+            await write_queue.submit(write)
+        except Exception:
+            # The lease runs out and the job is retried
+            logger.exception("Failed to record the outcome of job %d", job_id)
+
+
+def purge_finished(connection: Connection, retention_days: int, now: Optional[datetime] = None) -> int:
+    """Delete succeeded and failed jobs that finished more than `retention_days` ago."""
+    if not retention_days:
+        return 0
+    cutoff = (now or datetime.utcnow()) - timedelta(days=retention_days)
+    with connection.begin():
+        return connection.execute(
+            delete(Job).where(Job.status.in_((SUCCEEDED, FAILED)), Job.finished_at < cutoff)
+        ).rowcount
+
+
+job_queue = JobQueue(settings.job_concurrency, settings.job_poll_interval, settings.job_lease_seconds)
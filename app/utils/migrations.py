@@ -0,0 +1,80 @@
+import ast
+from pathlib import Path
+from typing import Optional
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+
+class SchemaOutOfDate(RuntimeError):
+    pass
+
+
+def alembic_config():
+    from alembic.config import Config
+
+    config = Config(str(PROJECT_ROOT / "alembic.ini"))
+    config.set_main_option("script_location", str(PROJECT_ROOT / "migrations"))
+    return config
+
+
+def _revision_ids(path: Path):
+    values = {}
+    for node in ast.parse(path.read_text(encoding="utf-8")).body:
+        if isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+            if node.targets[0].id in ("revision", "down_revision"):
+                values[node.targets[0].id] = ast.literal_eval(node.value)
+    down = values.get("down_revision")
+    return values.get("revision"), down if isinstance(down, (tuple, list)) else (down,)
+
+
+def head_revision() -> str:
+    """Head of the revision graph, read straight from the version files.
+
+    Importing alembic costs ~100 ms, which every worker would pay at boot
+    just to learn one revision id.
+    """
+    revisions, parents = set(), set()
+    for path in (PROJECT_ROOT / "migrations" / "versions").glob("*.py"):
+        revision, down_revisions = _revision_ids(path)
+        if revision:
+            revisions.add(revision)
+            parents.update(down for down in down_revisions if down)
+    heads = revisions - parents
+    if len(heads) != 1:
+        raise SchemaOutOfDate(f"Expected one migration head, found {sorted(heads) or 'none'}")
+    return heads.pop()
+
+
+def current_revision(engine: Engine) -> Optional[str]:
+    with engine.connect() as connection:
+        if not inspect(connection).has_table("alembic_version"):
+            return None
+        return connection.execute(text("SELECT version_num FROM alembic_version")).scalar()
+
+
+def migrate(engine: Engine) -> None:
+    """Upgrade to head; databases made by the old create_all are adopted at 0001."""
+    from alembic import command
+
+    config = alembic_config()
+    config.attributes["configure_logger"] = False
+    with engine.begin() as connection:
+        config.attributes["connection"] = connection
+        inspector = inspect(connection)
+        if not inspector.has_table("alembic_version") and inspector.has_table("users"):
+            command.stamp(config, "0001")
+        command.upgrade(config, "head")
+
+
+def check_schema_version(engine: Engine) -> None:
+    """The only database work a worker does at boot: one SELECT of the version row."""
+    current = current_revision(engine)
+    expected = head_revision()
+    if current != expected:
+        raise SchemaOutOfDate(
+            f"Database schema is at {current or 'no revision'}, expected {expected}. "
+            "Run `python -m app.manage migrate` first."
+        )
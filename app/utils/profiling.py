@@ -0,0 +1,115 @@
+"""Startup-time instrumentation.
+
+    python -m app.utils.profiling            # import cost per module + startup hook timings
+    python -m app.utils.profiling --top 40
+
+Set PROFILE_STARTUP=true to have every worker log its startup step durations.
+"""
+import argparse
+import logging
+import os
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from typing import Dict, List, NamedTuple
+
+from ..config import settings
+
+logger = logging.getLogger(__name__)
+
+# Step name -> seconds, filled in by the startup hooks
+startup_timings: Dict[str, float] = {}
+
+
+class ImportCost(NamedTuple):
+    module: str
+    self_us: int
+    cumulative_us: int
+
+
+@contextmanager
+def startup_step(name: str):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        startup_timings[name] = elapsed
+        if settings.profile_startup:
+            logger.info("startup step %s took %.1f ms", name, elapsed * 1000)
+
+
+def parse_importtime(output: str) -> List[ImportCost]:
+    """Parse the stderr of `python -X importtime`."""
+    costs = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:"):].split("|", 2)
+        costs.append(ImportCost(module.strip(), int(self_us), int(cumulative_us)))
+    return costs
+
+
+def import_costs(module: str = "app.main") -> List[ImportCost]:
+    """Import `module` in a fresh interpreter so nothing is already cached in sys.modules."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env=os.environ.copy(),
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr}")
+    return parse_importtime(result.stderr)
+
+
+async def run_startup_hooks() -> Dict[str, float]:
+    from ..main import app
+    # The hooks record into app.utils.profiling, which is not this module under `python -m`
+    from .profiling import startup_timings
+
+    startup_timings.clear()
+    start = time.perf_counter()
+    await app.router.startup()
+    startup_timings["total"] = time.perf_counter() - start
+    timings = dict(startup_timings)
+    await app.router.shutdown()
+    return timings
+
+
+def main(argv=None):
+    import asyncio
+
+    parser = argparse.ArgumentParser(prog="python -m app.utils.profiling", description="Profile worker startup")
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument("--no-hooks", action="store_true", help="only measure import cost")
+    args = parser.parse_args(argv)
+
+    costs = import_costs(args.module)
+    # Top-level packages own the cost of everything they pull in
+    by_package: Dict[str, int] = {}
+    for cost in costs:
+        package = cost.module.split(".", 1)[0]
+        by_package[package] = by_package.get(package, 0) + cost.self_us
+    total = next((cost.cumulative_us for cost in costs if cost.module == args.module), 0)
+
+    print(f"import {args.module}: {total / 1000:.1f} ms")
+    print(f"\n{'cumulative ms':>14} {'self ms':>9}  module")
+    for cost in sorted(costs, key=lambda cost: cost.cumulative_us, reverse=True)[:args.top]:
+        print(f"{cost.cumulative_us / 1000:>14.1f} {cost.self_us / 1000:>9.1f}  {cost.module}")
+    print(f"\n{'self ms':>14}  package")
+    for package, self_us in sorted(by_package.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        print(f"{self_us / 1000:>14.1f}  {package}")
+
+    if not args.no_hooks:
+        timings = asyncio.run(run_startup_hooks())
+        print(f"\n{'ms':>14}  startup step")
+        for name, seconds in timings.items():
+            print(f"{seconds * 1000:>14.1f}  {name}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
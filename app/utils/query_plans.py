@@ -0,0 +1,173 @@
+"""Query-plan checks for the hot read paths.
+
+Each query below is built by the same code the API uses and run through
+EXPLAIN QUERY PLAN (SQLite) or EXPLAIN (PostgreSQL). A check fails when the
+plan reads a whole table or sorts instead of walking an index, or runs the
+full-text match once per document row instead of once per search, so a
+dropped or mismatched index is caught before it reaches production.
+
+    python -m app.manage check-plans
+    pytest tests/test_query_plans.py
+"""
+import json
+import re
+from datetime import datetime
+from typing import Callable, List, NamedTuple
+
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+from ..api.documents import document_filters, listing_query, search_queries
+from ..api.stats import timeseries_query, top_query, totals_query
+from ..models.document import Document
+from ..models.menu import MenuItem
+from ..schemas.document import DocumentSearchRequest
+from ..search import get_backend
+from ..search.postgres import SEARCH_TABLE
+from ..search.sqlite import FTS_TABLE
+from .highlights import FEATURED, POPULAR, highlights
+from .jobs import due_query
+from .tree import subtree_query, tree_query
+
+INDEXED_TABLES = {"documents", "menu_items", "download_rollups", "download_category_rollups", "jobs", SEARCH_TABLE}
+SEARCH_TERMS = "qurilish normalari"
+
+
+class explain(Executable, ClauseElement):
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(explain)
+def _compile_explain(element, compiler, **kw):
+    prefix = "EXPLAIN QUERY PLAN " if compiler.dialect.name == "sqlite" else "EXPLAIN (FORMAT JSON) "
+    return prefix + compiler.process(element.statement, **kw)
+
+
+class HotQuery(NamedTuple):
+    name: str
+    build: Callable[[str], object]  # dialect name -> statement
+    ordered: bool = True
+
+
+class PlanProblem(NamedTuple):
+    query: str
+    problem: str
+    plan: str
+
+
+def _listing(dialect: str, **params):
+    return listing_query(document_filters(DocumentSearchRequest(**params), dialect)).limit(21)
+
+
+def _listing_after_cursor(dialect: str):
+    return _listing(dialect).where(
+        tuple_(Document.created_at, Document.id) > tuple_(datetime(2024, 1, 1), 1)
+    )
+
+
+def _count(dialect: str):
+    filters = document_filters(DocumentSearchRequest(category="standards"), dialect)
+    return select(func.count(Document.id)).where(*filters)
+
+
+def _search(dialect: str, count: bool = False, **params):
+    filters = document_filters(DocumentSearchRequest(query=SEARCH_TERMS, **params), dialect)
+    query, count_query = search_queries(filters, get_backend(dialect).ranked(SEARCH_TERMS, "uz"), "uz")
+    return count_query if count else query.limit(20)
+
+
+HOT_QUERIES: List[HotQuery] = [
+    HotQuery("documents: list", lambda dialect: _listing(dialect)),
+    HotQuery("documents: list by category", lambda dialect: _listing(dialect, category="standards")),
+    HotQuery("documents: list by type", lambda dialect: _listing(dialect, document_type="law")),
+    HotQuery("documents: list featured", lambda dialect: _listing(dialect, is_featured=True)),
+    HotQuery("documents: next page by cursor", _listing_after_cursor),
+    HotQuery("documents: count by category", _count, ordered=False),
+    # Ordered by rank, so only scans and per-row matches are checked
+    HotQuery("documents: search", lambda dialect: _search(dialect), ordered=False),
+    HotQuery("documents: search count", lambda dialect: _search(dialect, count=True), ordered=False),
+    HotQuery("documents: search by category", lambda dialect: _search(dialect, category="standards"), ordered=False),
+    HotQuery(
+        "documents: search count by category",
+        lambda dialect: _search(dialect, count=True, category="standards"),
+        ordered=False,
+    ),
+    HotQuery("menu: active tree", lambda dialect: tree_query(MenuItem), ordered=False),
+    HotQuery("menu: subtree", lambda dialect: subtree_query(MenuItem, 1), ordered=False),
+    HotQuery("highlights: popular", lambda dialect: highlights.query(POPULAR, None)),
+    HotQuery("highlights: popular by type", lambda dialect: highlights.query(POPULAR, "law")),
+    HotQuery("highlights: featured", lambda dialect: highlights.query(FEATURED, None)),
+    HotQuery("highlights: featured by type", lambda dialect: highlights.query(FEATURED, "law")),
+    # Sorted by aggregates, so only scans are checked
+    HotQuery("stats: top documents", lambda dialect: top_query(30, 10, "uz"), ordered=False),
+    HotQuery("stats: document time series", lambda dialect: timeseries_query("day", 30, document_id=1), ordered=False),
+    HotQuery("stats: type time series", lambda dialect: timeseries_query("day", 30, document_type="law"), ordered=False),
+    HotQuery("stats: totals", lambda dialect: totals_query(30, "category"), ordered=False),
+    HotQuery("jobs: due poll", lambda dialect: due_query(datetime.utcnow()).limit(1), ordered=False),
+]
+
+
+def _sqlite_problems(rows, ordered: bool) -> List[str]:
+    problems = []
+    for row in rows:
+        detail = row[-1]
+        virtual = re.match(rf"SCAN {FTS_TABLE} VIRTUAL TABLE INDEX \d+:(\S*)", detail)
+        if virtual:
+            # FTS5 index string: M = MATCH, "=" = rowid lookup driven by an outer loop
+            if "M" not in virtual.group(1):
+                problems.append(f"full scan of {FTS_TABLE}")
+            elif "=" in virtual.group(1):
+                problems.append("full-text MATCH runs once per documents row")
+            continue
+        scan = re.match(r"SCAN (?:TABLE )?(\w+)(.*)", detail)
+        if scan and scan.group(1) in INDEXED_TABLES and "USING" not in scan.group(2):
+            problems.append(f"full scan of {scan.group(1)}")
+        if ordered and detail.startswith("USE TEMP B-TREE FOR ORDER BY"):
+            problems.append("ORDER BY is not served by an index")
+    return problems
+
+
+def _postgres_problems(plan: dict, ordered: bool) -> List[str]:
+    problems = []
+    # (node, runs once per row of an outer node)
+    nodes = [(plan, False)]
+    while nodes:
+        node, repeated = nodes.pop()
+        if node["Node Type"] == "Seq Scan" and node.get("Relation Name") in INDEXED_TABLES:
+            problems.append(f"full scan of {node['Relation Name']}")
+        if repeated and node.get("Relation Name") == SEARCH_TABLE:
+            problems.append("full-text @@ match runs once per documents row")
+        if ordered and node["Node Type"] in ("Sort", "Incremental Sort"):
+            problems.append("ORDER BY is not served by an index")
+        for child in node.get("Plans", []):
+            inner = node["Node Type"] == "Nested Loop" and child.get("Parent Relationship") == "Inner"
+            nodes.append((child, repeated or inner or child.get("Parent Relationship") == "SubPlan"))
+    return problems
+
+
+def check_query_plans(connection: Connection) -> List[PlanProblem]:
+    """EXPLAIN every hot query; returns the ones that fall back to scans or sorts."""
+    dialect = connection.dialect.name
+    if dialect == "postgresql":
+        # Small development tables make sequential scans cheapest; ask whether an index path exists
+        connection.exec_driver_sql("SET LOCAL enable_seqscan = off")
+        connection.exec_driver_sql("SET LOCAL enable_sort = off")
+
+    found = []
+    for query in HOT_QUERIES:
+        rows = connection.execute(explain(query.build(dialect))).all()
+        if dialect == "sqlite":
+            plan = "\n".join(row[-1] for row in rows)
+            problems = _sqlite_problems(rows, query.ordered)
+        else:
+            document = rows[0][0]
+            document = json.loads(document) if isinstance(document, str) else document
+            plan = json.dumps(document, indent=2)
+            problems = _postgres_problems(document[0]["Plan"], query.ordered)
+        found.extend(PlanProblem(query.name, problem, plan) for problem in dict.fromkeys(problems))
+    return found
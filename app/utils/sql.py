@@ -0,0 +1,9 @@
+def upsert(dialect_name: str, table):
+    """INSERT supporting on_conflict_do_nothing/do_update on SQLite and PostgreSQL."""
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect_name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise RuntimeError(f"Upserts are not supported on '{dialect_name}'")
+    return insert(table)
@@ -0,0 +1,148 @@
+"""Download statistics kept as hourly and daily rollups.
+
+Every flush of DownloadRecorder adds its events to download_rollups (per
+document) and download_category_rollups (per document_type and category)
+with increment upserts, in the same transaction that writes the raw
+download_logs rows. Reports read only the rollups, so their cost grows with
+the number of buckets rather than the number of downloads, and raw rows can
+be dropped after download_log_retention_days.
+"""
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import delete, select, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.document import Document, DownloadLog
+from ..models.stats import DownloadCategoryRollup, DownloadRollup
+from .sql import upsert
+
+PERIODS = ("hour", "day")
+COMPACT_BATCH_SIZE = 10_000
+
+
+def bucket_start(moment: datetime, period: str) -> datetime:
+    if period == "hour":
+        return moment.replace(minute=0, second=0, microsecond=0)
+    return moment.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _increment(dialect_name: str, table, key_columns):
+    statement = upsert(dialect_name, table)
+    return statement.on_conflict_do_update(
+        index_elements=key_columns,
+        set_={"downloads": table.c.downloads + statement.excluded.downloads},
+    )
+
+
+async def record_rollups(db: AsyncSession, events: Iterable[dict]) -> None:
+    """Add download events (document_id, downloaded_at) to both rollup tables."""
+    events = list(events)
+    if not events:
+        return
+    document_ids = {event["document_id"] for event in events}
+    classes = {
+        row.id: (row.document_type or "", row.category or "")
+        for row in await db.execute(
+            select(Document.id, Document.document_type, Document.category).where(Document.id.in_(document_ids))
+        )
+    }
+
+    per_document: Counter = Counter()
+    per_category: Counter = Counter()
+    for event in events:
+        document_type, category = classes.get(event["document_id"], ("", ""))
+        for period in PERIODS:
+            bucket = bucket_start(event["downloaded_at"], period)
+            per_document[period, bucket, event["document_id"]] += 1
+            per_category[period, bucket, document_type, category] += 1
+
+    dialect_name = db.get_bind().dialect.name
+    documents = DownloadRollup.__table__
+    await db.execute(
+        _increment(dialect_name, documents, ["period", "bucket", "document_id"]),
+        [
+            {"period": period, "bucket": bucket, "document_id": document_id, "downloads": downloads}
+            for (period, bucket, document_id), downloads in per_document.items()
+        ],
+    )
+    categories = DownloadCategoryRollup.__table__
+    await db.execute(
+        _increment(dialect_name, categories, ["period", "bucket", "document_type", "category"]),
+        [
+            {"period": period, "bucket": bucket, "document_type": document_type, "category": category, "downloads": downloads}
+            for (period, bucket, document_type, category), downloads in per_category.items()
+        ],
+    )
+
+
+def _bucket_sql(dialect_name: str, period: str) -> str:
+    if dialect_name == "postgresql":
+        return f"date_trunc('{period}', l.downloaded_at)"
+    # Same text format SQLAlchemy stores SQLite DateTime values in
+    fmt = "%Y-%m-%d %H:00:00.000000" if period == "hour" else "%Y-%m-%d 00:00:00.000000"
+    return f"strftime('{fmt}', l.downloaded_at)"
+
+
+def rebuild_download_rollups(connection: Connection) -> None:
+    """Recompute both rollup tables from download_logs.
+
+    For the initial backfill and for databases whose download_logs were
+    written directly (seeding, imports). Rows already compacted away are
+    lost from the rebuilt rollups, so do not run this after retention has
+    deleted anything.
+    """
+    dialect_name = connection.dialect.name
+    connection.execute(delete(DownloadRollup))
+    connection.execute(delete(DownloadCategoryRollup))
+    for period in PERIODS:
+        bucket = _bucket_sql(dialect_name, period)
+        connection.execute(text(
+            f"INSERT INTO download_rollups (period, bucket, document_id, downloads) "
+            f"SELECT :period, {bucket}, l.document_id, count(*) FROM download_logs l "
+            f"WHERE l.document_id IS NOT NULL GROUP BY {bucket}, l.document_id"
+        ), {"period": period})
+        connection.execute(text(
+            f"INSERT INTO download_category_rollups (period, bucket, document_type, category, downloads) "
+            f"SELECT :period, {bucket}, coalesce(d.document_type, ''), coalesce(d.category, ''), count(*) "
+            f"FROM download_logs l LEFT JOIN documents d ON d.id = l.document_id "
+            f"WHERE l.document_id IS NOT NULL GROUP BY {bucket}, coalesce(d.document_type, ''), coalesce(d.category, '')"
+        ), {"period": period})
+
+
+def compact_downloads(connection: Connection, log_retention_days: int, hourly_retention_days: int,
+            now: Optional[datetime] = None) -> Dict[str, int]:
+    """Delete raw download_logs and hourly rollups past their retention; daily rollups are kept.
+
+    Raw rows go in batches, one transaction each, so the writer is never
+    locked out for long. A retention of 0 keeps everything.
+    """
+    now = now or datetime.utcnow()
+    deleted = {"download_logs": 0, "hourly_rollups": 0}
+    if log_retention_days:
+        cutoff = now - timedelta(days=log_retention_days)
+        while True:
+            batch = (
+                select(DownloadLog.id)
+                .where(DownloadLog.downloaded_at < cutoff)
+                .limit(COMPACT_BATCH_SIZE)
+                .scalar_subquery()
+            )
+            with connection.begin():
+                count = connection.execute(delete(DownloadLog).where(DownloadLog.id.in_(batch))).rowcount
+            deleted["download_logs"] += count
+            if count < COMPACT_BATCH_SIZE:
+                break
+    if hourly_retention_days:
+        cutoff = bucket_start(now - timedelta(days=hourly_retention_days), "hour")
+        with connection.begin():
+            deleted["hourly_rollups"] = connection.execute(
+                delete(DownloadRollup).where(DownloadRollup.period == "hour", DownloadRollup.bucket < cutoff)
+            ).rowcount
+            connection.execute(
+                delete(DownloadCategoryRollup)
+                .where(DownloadCategoryRollup.period == "hour", DownloadCategoryRollup.bucket < cutoff)
+            )
+    return deleted
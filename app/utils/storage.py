@@ -0,0 +1,110 @@
+import hashlib
+import mimetypes
+import os
+import tempfile
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+from fastapi import UploadFile
+from starlette.concurrency import run_in_threadpool
+
+from ..config import settings
+
+CHUNK_SIZE = 1024 * 1024
+
+# Leading bytes of the formats we actually receive
+_SIGNATURES = (
+    (b"%PDF-", "application/pdf"),
+    (b"PK\x03\x04", "application/zip"),
+    (b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1", "application/msword"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"II*\x00", "image/tiff"),
+    (b"MM\x00*", "image/tiff"),
+)
+
+# Office Open XML files are zip archives; trust the extension to tell them apart
+_ZIP_BASED = {".docx", ".xlsx", ".pptx", ".odt", ".ods"}
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
+class StoredFile(NamedTuple):
+    path: str  # relative to media_root
+    size: int
+    sha256: str
+    content_type: str
+    created: bool  # False when identical content was already stored
+
+
+def blob_path(sha256: str) -> str:
+    return f"blobs/{sha256[:2]}/{sha256[2:4]}/{sha256}"
+
+
+def detect_content_type(head: bytes, filename: Optional[str], declared: Optional[str]) -> str:
+    guessed = mimetypes.guess_type(filename or "")[0]
+    for signature, content_type in _SIGNATURES:
+        if head.startswith(signature):
+            if content_type == "application/zip" and Path(filename or "").suffix.lower() in _ZIP_BASED:
+                return guessed or content_type
+            return content_type
+    if declared and declared != "application/octet-stream":
+        return declared
+    return guessed or "application/octet-stream"
+
+
+def _write_chunk(out, digest, chunk: bytes) -> None:
+    # hashlib releases the GIL for large buffers, so both run off the event loop
+    digest.update(chunk)
+    out.write(chunk)
+
+
+async def store_upload(upload: UploadFile) -> StoredFile:
+    """Copy an upload into content-addressed storage, chunk by chunk.
+
+    Files are named by their SHA-256, so uploading the same bytes twice keeps
+    a single copy on disk.
+    """
+    root = Path(settings.media_root)
+    tmp_dir = root / "tmp"
+    tmp_dir.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=tmp_dir)
+    digest = hashlib.sha256()
+    size = 0
+    head = b""
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = await upload.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                if not head:
+                    head = chunk[:16]
+                size += len(chunk)
+                if size > settings.max_upload_size:
+                    raise UploadTooLarge()
+                await run_in_threadpool(_write_chunk, out, digest, chunk)
+
+        sha256 = digest.hexdigest()
+        relative = blob_path(sha256)
+        target = root / relative
+        created = not target.exists()
+        if created:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(tmp_path, target)
+        else:
+            os.unlink(tmp_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+    return StoredFile(
+        path=relative,
+        size=size,
+        sha256=sha256,
+        content_type=detect_content_type(head, upload.filename, upload.content_type),
+        created=created,
+    )
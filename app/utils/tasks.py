@@ -0,0 +1,123 @@
+"""Side effects of document writes, run as background jobs.
+
+extract_text fills documents.content from an uploaded text file; the ORM
+update reindexes the document for search in the same transaction.
+notify_document emails notification_recipients about a created or updated
+document. Both read the document when they run, not when they were queued,
+so a retry sees the latest state.
+"""
+import smtplib
+from email.message import EmailMessage
+from pathlib import Path
+from typing import List
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from ..config import settings
+from ..database import read_session
+from ..models.document import Document
+from ..models.job import Job
+from .downloads import resolve_media_path
+from .i18n import DEFAULT_LANGUAGE, localize
+from .jobs import PermanentJobError, enqueue, job_handler
+from .writes import write_queue
+
+EXTRACT_TEXT = "extract_text"
+NOTIFY_DOCUMENT = "notify_document"
+# Tried in order; Cyrillic documents are often saved as Windows-1251
+TEXT_ENCODINGS = ("utf-8-sig", "cp1251")
+
+
+def enqueue_document_jobs(db: AsyncSession, document: Document, action: str, file_uploaded: bool = False) -> List[Job]:
+    """Queue the side effects of a document write in the same transaction."""
+    jobs = []
+    if file_uploaded and (document.file_type or "").startswith("text/"):
+        jobs.append(enqueue(db, EXTRACT_TEXT, {"document_id": document.id, "file_path": document.file_path}))
+    if settings.notification_recipients:
+        jobs.append(enqueue(db, NOTIFY_DOCUMENT, {"document_id": document.id, "action": action}))
+    return jobs
+
+
+def _read_text(path: Path, max_bytes: int) -> str:
+    with open(path, "rb") as f:
+        data = f.read(max_bytes)
+    for encoding in TEXT_ENCODINGS:
+        try:
+            return data.decode(encoding)
+        except UnicodeDecodeError:
+            continue
+    return data.decode("utf-8", errors="replace")
+
+
+@job_handler(EXTRACT_TEXT)
+async def extract_text(payload: dict) -> dict:
+    document_id = payload["document_id"]
+    async with read_session(primary=True) as db:
+        row = (await db.execute(
+            select(Document.file_path, Document.file_type, Document.content).where(Document.id == document_id)
+        )).first()
+    if row is None:
+        raise PermanentJobError("Document not found")
+    if row.file_path != payload.get("file_path"):
+        return {"skipped": "file replaced"}
+    if row.content:
+        return {"skipped": "document already has content"}
+    if not (row.file_type or "").startswith("text/"):
+        return {"skipped": f"no text extractor for {row.file_type}"}
+    path = resolve_media_path(row.file_path)
+    if path is None or not path.is_file():
+        raise PermanentJobError("File not found")
+    text = (await run_in_threadpool(_read_text, path, settings.extract_text_max_bytes)).replace("\x00", "")
+
+    async def store(db: AsyncSession):
+        db_document = await db.get(Document, document_id)
+        # Re-checked in the write: an edit may have landed since the read
+        if db_document is None or db_document.content or db_document.file_path != row.file_path:
+            return False
+        db_document.content = text
+        return True
+
+    if not await write_queue.submit(store):
+        return {"skipped": "document changed"}
+    return {"characters": len(text)}
+
+
+def _send(message: EmailMessage):
+    if settings.smtp_port == 465:
+        smtp = smtplib.SMTP_SSL(settings.smtp_server, settings.smtp_port, timeout=30)
+    else:
+        smtp = smtplib.SMTP(settings.smtp_server, settings.smtp_port, timeout=30)
+    with smtp:
+        if settings.smtp_port != 465:
+            smtp.starttls()
+        smtp.login(settings.smtp_username, settings.smtp_password)
+        smtp.send_message(message)
+
+
+@job_handler(NOTIFY_DOCUMENT)
+async def notify_document(payload: dict) -> dict:
+    recipients = settings.notification_recipients
+    if not recipients:
+        return {"skipped": "no recipients"}
+    async with read_session(primary=True) as db:
+        row = (await db.execute(
+            select(Document.title, Document.document_number, Document.document_type).where(Document.id == payload["document_id"])
+        )).first()
+    if row is None:
+        raise PermanentJobError("Document not found")
+    title = localize(row.title, DEFAULT_LANGUAGE) or row.document_number or f"#{payload['document_id']}"
+
+    message = EmailMessage()
+    message["Subject"] = f"Document {payload.get('action', 'updated')}: {title}"
+    message["From"] = settings.smtp_from or settings.smtp_username
+    message["To"] = ", ".join(recipients)
+    message.set_content(
+        f"{title}\n"
+        f"Number: {row.document_number or '-'}\n"
+        f"Type: {row.document_type or '-'}\n"
+        f"{settings.frontend_url}/documents/{payload['document_id']}\n"
+    )
+    await run_in_threadpool(_send, message)
+    return {"recipients": len(recipients)}
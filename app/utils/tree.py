@@ -0,0 +1,108 @@
+from collections import defaultdict
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy import literal, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .i18n import projected
+
+# Hard stop for malformed (cyclic) parent chains
+MAX_TREE_DEPTH = 16
+
+
+def tree_depth(max_depth: Optional[int]) -> Optional[int]:
+    """`max_depth` as the loaders apply it: None (the whole tree) from MAX_TREE_DEPTH up."""
+    if max_depth is None or max_depth >= MAX_TREE_DEPTH:
+        return None
+    return max_depth
+
+
+def build_tree(rows: List[dict], root_parent_id: Optional[int] = None, max_depth: Optional[int] = None) -> List[dict]:
+    """Nest flat rows by parent_id, ordering siblings by (order, id)."""
+    by_parent: Dict[Optional[int], List[dict]] = defaultdict(list)
+    for row in rows:
+        by_parent[row["parent_id"]].append(row)
+    for siblings in by_parent.values():
+        siblings.sort(key=lambda node: (node["order"] or 0, node["id"]))
+
+    limit = min(max_depth or MAX_TREE_DEPTH, MAX_TREE_DEPTH)
+    seen = set()
+
+    def children_of(parent_id, depth):
+        nodes = []
+        for row in by_parent.get(parent_id, []):
+            if row["id"] in seen:
+                continue
+            seen.add(row["id"])
+            node = dict(row)
+            node["children"] = children_of(row["id"], depth + 1) if depth < limit else []
+            nodes.append(node)
+        return nodes
+
+    return children_of(root_parent_id, 1)
+
+
+def _columns(table, localized: Sequence[str], lang: Optional[str]):
+    if not lang:
+        return list(table.c)
+    return [projected(column, lang) if column.key in localized else column for column in table.c]
+
+
+def tree_query(model, localized: Sequence[str] = (), lang: Optional[str] = None, **filters):
+    """Active rows; with `lang`, the `localized` JSON columns carry one translation."""
+    table = model.__table__
+    query = select(*_columns(table, localized, lang)).where(table.c.is_active == True)
+    for column, value in filters.items():
+        query = query.where(table.c[column] == value)
+    return query
+
+
+def subtree_query(model, root_id: int, limit: int = MAX_TREE_DEPTH, localized: Sequence[str] = (), lang: Optional[str] = None):
+    table = model.__table__
+    columns = _columns(table, localized, lang)
+    nodes = (
+        select(*columns, literal(1).label("depth"))
+        .where(table.c.id == root_id)
+        .cte("subtree", recursive=True)
+    )
+    nodes = nodes.union_all(
+        select(*columns, (nodes.c.depth + 1).label("depth"))
+        .join(nodes, table.c.parent_id == nodes.c.id)
+        .where(table.c.is_active == True, nodes.c.depth < limit)
+    )
+    return select(nodes)
+
+
+async def load_tree(
+    db: AsyncSession,
+    model,
+    max_depth: Optional[int] = None,
+    localized: Sequence[str] = (),
+    lang: Optional[str] = None,
+    **filters,
+) -> List[dict]:
+    """Whole active forest of a self-referential model in a single SELECT."""
+    query = tree_query(model, localized, lang, **filters)
+    rows = [dict(row) for row in (await db.execute(query)).mappings()]
+    return build_tree(rows, max_depth=max_depth)
+
+
+async def load_subtree(
+    db: AsyncSession,
+    model,
+    root_id: int,
+    max_depth: Optional[int] = None,
+    localized: Sequence[str] = (),
+    lang: Optional[str] = None,
+) -> Optional[dict]:
+    """One node plus its active descendants via a recursive CTE."""
+    limit = min(max_depth or MAX_TREE_DEPTH, MAX_TREE_DEPTH)
+    query = subtree_query(model, root_id, limit, localized, lang)
+    rows = [dict(row) for row in (await db.execute(query)).mappings()]
+    root = next((row for row in rows if row["id"] == root_id), None)
+    if root is None:
+        return None
+    descendants = [row for row in rows if row["id"] != root_id]
+    root = dict(root)
+    root["children"] = build_tree(descendants, root_parent_id=root_id, max_depth=limit - 1)
+    return root
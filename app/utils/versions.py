@@ -0,0 +1,61 @@
+from datetime import datetime
+from itertools import chain
+from typing import List, Optional, Tuple
+
+from sqlalchemy import event, select, update
+from sqlalchemy.engine import Connection, Row
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from ..models.version import TableVersion
+
+# Tables whose content is served with version-based validators
+VERSIONED_TABLES = ("documents", "document_categories", "menu_items")
+# Download counters move far more often than documents; bumped at most every
+# download_count_publish_interval so listing validators and highlights do not churn
+DOWNLOADS_VERSION = "document_downloads"
+
+
+def version_bump(*names: str):
+    """UPDATE for write paths that bypass the ORM unit of work (bulk inserts, counters)."""
+    table = TableVersion.__table__
+    return (
+        update(table)
+        .where(table.c.name.in_(sorted(set(names))))
+        .values(version=table.c.version + 1, updated_at=datetime.utcnow())
+    )
+
+
+def bump_version(connection: Connection, *names: str) -> None:
+    connection.execute(version_bump(*names))
+
+
+async def read_version(db: AsyncSession, name: str) -> Optional[Row]:
+    """(version, updated_at) of one table: a primary key lookup."""
+    return (await db.execute(
+        select(TableVersion.version, TableVersion.updated_at).where(TableVersion.name == name)
+    )).first()
+
+
+async def read_versions(db: AsyncSession, *names: str) -> List[Tuple[int, Optional[datetime]]]:
+    """(version, updated_at) of several tables in one query, in `names` order; (0, None) if missing."""
+    rows = {
+        row.name: (row.version, row.updated_at)
+        for row in await db.execute(
+            select(TableVersion.name, TableVersion.version, TableVersion.updated_at).where(TableVersion.name.in_(names))
+        )
+    }
+    return [rows.get(name, (0, None)) for name in names]
+
+
+@event.listens_for(Session, "after_flush")
+def _bump_flushed_tables(session: Session, flush_context):
+    # new/dirty/deleted still describe what was just flushed
+    names = {
+        obj.__table__.name
+        for obj in chain(session.new, session.dirty, session.deleted)
+        if getattr(obj, "__table__", None) is not None
+    }
+    names.intersection_update(VERSIONED_TABLES)
+    if names:
+        bump_version(session.connection(), *names)
@@ -0,0 +1,124 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, List, Optional, Tuple, TypeVar
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..config import settings
+from ..database import SINGLE_WRITER, AsyncSessionLocal
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+WriteJob = Callable[[AsyncSession], Awaitable[T]]
+
+
+class WriteQueue:
+    """Runs write jobs one at a time on the writer connection and commits them in groups.
+
+    SQLite allows a single writer; concurrent write transactions only queue on
+    its lock or fail with "database is locked". Jobs submitted here run in
+    order, each inside its own SAVEPOINT so a failing job rolls back alone,
+    and every job queued while the previous group was committing is committed
+    with the next one. Jobs must not commit themselves.
+
+    With `enabled` off (server databases) every job simply runs in its own
+    session and transaction.
+    """
+
+    def __init__(self, batch_size: int, enabled: bool):
+        self.batch_size = batch_size
+        self.enabled = enabled
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.committed = 0
+        self.groups = 0
+
+    async def submit(self, fn: WriteJob) -> T:
+        """Run `fn(db)` and wait until its changes are committed; returns what `fn` returned."""
+        if not self.enabled:
+            async with AsyncSessionLocal() as db:
+                result = await fn(db)
+                await db.commit()
+                return result
+        self._ensure_worker()
+        future = self._loop.create_future()
+        await self._queue.put((fn, future))
+        return await future
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def _ensure_worker(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._task is None or self._task.done():
+            # First use, or a new event loop (tests, CLI tools)
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._task = loop.create_task(self._run())
+
+    async def start(self):
+        if self.enabled:
+            self._ensure_worker()
+
+    async def stop(self):
+        """Commit whatever is queued, then stop the worker."""
+        if self._task is None:
+            return
+        if self._loop is asyncio.get_running_loop():
+            await self._queue.join()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self):
+        while True:
+            jobs = [await self._queue.get()]
+            while len(jobs) < self.batch_size and not self._queue.empty():
+                jobs.append(self._queue.get_nowait())
+            try:
+                await self._commit_group(jobs)
+            finally:
+                for _ in jobs:
+                    self._queue.task_done()
+
+    async def _commit_group(self, jobs: List[Tuple[WriteJob, asyncio.Future]]):
+        outcomes = []
+        try:
+            async with AsyncSessionLocal() as db:
+                for fn, future in jobs:
+                    if future.done():
+                        # The caller went away before its turn
+                        continue
+                    try:
+                        async with db.begin_nested():
+                            result = await fn(db)
+                    except Exception as exc:
+                        outcomes.append((future, None, exc))
+                    else:
+                        outcomes.append((future, result, None))
+                await db.commit()
+        except Exception as exc:
+            logger.exception("Failed to commit a group of %d writes", len(jobs))
+            for _, future in jobs:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+
+        self.groups += 1
+        for future, result, exc in outcomes:
+            if future.done():
+                continue
+            if exc is not None:
+                future.set_exception(exc)
+            else:
+                self.committed += 1
+                future.set_result(result)
+
+
+write_queue = WriteQueue(settings.write_batch_size, SINGLE_WRITER)
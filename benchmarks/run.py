@@ -0,0 +1,248 @@
+"""In-process load benchmark for the API.
+
+    python -m benchmarks.run                                  # seed (first run) and benchmark
+    python -m benchmarks.run --documents 10000 --download-logs 50000 --reseed
+    python -m benchmarks.run --concurrency 1,16,64 --duration 10 --scenario documents_list
+    python -m benchmarks.run --baseline benchmarks/results/<earlier run>.json
+
+Requests go through httpx.ASGITransport straight into the app, so the numbers
+measure the application and database rather than the network or a server.
+Results are written as JSON to benchmarks/results/ for later comparison.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+BENCH_DIR = Path(__file__).resolve().parent
+ADMIN = {"username": "admin", "password": "admin123"}
+
+
+class Scenario(NamedTuple):
+    name: str
+    # (client, rng, document ids) -> response
+    request: Callable
+
+
+def _scenarios(api: str, categories: List[str]) -> Dict[str, Scenario]:
+    document_types = ["law", "standard", "regulation", "shnq", "reference"]
+
+    def documents_list(client, rng, ids):
+        params = {"per_page": 20, "lang": rng.choice(["uz", "ru", "en"])}
+        choice = rng.random()
+        if choice < 0.3 and categories:
+            params["category"] = rng.choice(categories)
+        elif choice < 0.6:
+            params["document_type"] = rng.choice(document_types)
+        elif choice < 0.7:
+            params["page"] = rng.randint(2, 50)
+        return client.get(f"{api}/documents", params=params)
+
+    return {
+        scenario.name: scenario
+        for scenario in [
+            Scenario("health", lambda client, rng, ids: client.get("/health")),
+            Scenario("menu", lambda client, rng, ids: client.get(f"{api}/menu", params={"lang": rng.choice(["uz", "ru", "en"])})),
+            Scenario("documents_list", documents_list),
+            Scenario("documents_detail", lambda client, rng, ids: client.get(f"{api}/documents/{rng.choice(ids)}")),
+            Scenario("highlights", lambda client, rng, ids: client.get(f"{api}/documents/highlights", params={
+                "lang": rng.choice(["uz", "ru", "en"]), "document_type": rng.choice(document_types + [None]),
+            })),
+            Scenario("login", lambda client, rng, ids: client.post(f"{api}/auth/login", json=ADMIN)),
+        ]
+    }
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+async def run_level(client, scenario: Scenario, concurrency: int, duration: float, ids: List[int], seed: int) -> dict:
+    latencies: List[float] = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def worker(n: int):
+        nonlocal errors
+        rng = random.Random(seed + n)
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            response = await scenario.request(client, rng, ids)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(n) for n in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "scenario": scenario.name,
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors,
+        "duration_s": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50) * 1000, 2),
+            "p95": round(percentile(latencies, 95) * 1000, 2),
+            "p99": round(percentile(latencies, 99) * 1000, 2),
+            "mean": round(sum(latencies) / len(latencies) * 1000, 2) if latencies else 0.0,
+            "max": round(latencies[-1] * 1000, 2) if latencies else 0.0,
+        },
+    }
+
+
+async def benchmark(args, scenario_names: List[str], levels: List[int]) -> List[dict]:
+    import httpx
+    from sqlalchemy import select
+
+    from app.config import settings
+    from app.database import SessionLocal
+    from app.main import app
+    from app.models.document import Document
+
+    with SessionLocal() as db:
+        ids = list(db.scalars(select(Document.id).where(Document.is_active == True)))
+        categories = list(db.scalars(select(Document.category).distinct().limit(200)))
+    if not ids:
+        raise SystemExit("The benchmark database has no documents; run with --reseed")
+
+    scenarios = _scenarios(settings.api_v1_str, [category for category in categories if category])
+    results = []
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://localhost") as client:
+            for name in scenario_names:
+                scenario = scenarios[name]
+                # Warm caches and lazy imports outside the measured window
+                await scenario.request(client, random.Random(args.seed), ids)
+                for concurrency in levels:
+                    result = await run_level(client, scenario, concurrency, args.duration, ids, args.seed)
+                    results.append(result)
+                    latency = result["latency_ms"]
+                    print(
+                        f"{name:<18} c={concurrency:<4} {result['throughput_rps']:>9.1f} req/s  "
+                        f"p50 {latency['p50']:>8.2f} ms  p95 {latency['p95']:>8.2f} ms  "
+                        f"p99 {latency['p99']:>8.2f} ms  errors {result['errors']}"
+                    )
+    return results
+
+
+def compare(results: List[dict], baseline_path: str) -> None:
+    baseline = {
+        (result["scenario"], result["concurrency"]): result
+        for result in json.loads(Path(baseline_path).read_text())["results"]
+    }
+    print(f"\nCompared with {baseline_path}:")
+    for result in results:
+        before = baseline.get((result["scenario"], result["concurrency"]))
+        if before is None:
+            continue
+
+        def change(after, prior):
+            return f"{(after - prior) / prior * 100:+.1f}%" if prior else "n/a"
+
+        print(
+            f"{result['scenario']:<18} c={result['concurrency']:<4} "
+            f"throughput {change(result['throughput_rps'], before['throughput_rps']):>8}  "
+            f"p95 {change(result['latency_ms']['p95'], before['latency_ms']['p95']):>8}  "
+            f"p99 {change(result['latency_ms']['p99'], before['latency_ms']['p99']):>8}"
+        )
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, cwd=BENCH_DIR, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run", description="Benchmark the API in-process")
+    parser.add_argument("--db", default=str(BENCH_DIR / "bench.db"), help="SQLite file to seed and benchmark")
+    parser.add_argument("--reseed", action="store_true", help="drop and re-seed the database")
+    parser.add_argument("--documents", type=int, default=100_000)
+    parser.add_argument("--download-logs", type=int, default=1_000_000)
+    parser.add_argument("--menu-depth", type=int, default=4)
+    parser.add_argument("--menu-fanout", type=int, default=5)
+    parser.add_argument("--category-depth", type=int, default=4)
+    parser.add_argument("--category-fanout", type=int, default=4)
+    parser.add_argument("--scenario", action="append", help="run only these scenarios (repeatable)")
+    parser.add_argument("--concurrency", default="1,10,50", help="comma-separated concurrency levels")
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per scenario and level")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="results file (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--baseline", help="earlier results file to compare against")
+    args = parser.parse_args(argv)
+
+    # Settings are read at import time, so configure the app before importing it
+    db_path = Path(args.db).resolve()
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+    os.environ.setdefault("METRICS_ENABLED", "false")
+    os.environ.setdefault("MEDIA_ROOT", str(BENCH_DIR / "media"))
+
+    from .seed import Volumes, seed_volumes
+
+    volumes = Volumes(
+        documents=args.documents,
+        download_logs=args.download_logs,
+        menu_depth=args.menu_depth,
+        menu_fanout=args.menu_fanout,
+        category_depth=args.category_depth,
+        category_fanout=args.category_fanout,
+    )
+    meta_path = db_path.with_suffix(".json")
+    if args.reseed or not db_path.exists():
+        for path in (db_path, meta_path, Path(f"{db_path}-wal"), Path(f"{db_path}-shm")):
+            if path.exists():
+                path.unlink()
+        print(f"Seeding {db_path} ...", file=sys.stderr)
+        started = time.perf_counter()
+        meta_path.write_text(json.dumps(seed_volumes(volumes, args.seed)))
+        print(f"Seeded in {time.perf_counter() - started:.1f} s", file=sys.stderr)
+    seeded = json.loads(meta_path.read_text()) if meta_path.exists() else None
+
+    scenario_names = args.scenario or ["health", "menu", "documents_list", "documents_detail", "highlights", "login"]
+    unknown = set(scenario_names) - set(_scenarios("", []))
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(sorted(unknown))}")
+    levels = [int(level) for level in args.concurrency.split(",") if level.strip()]
+
+    results = asyncio.run(benchmark(args, scenario_names, levels))
+
+    output = Path(args.output) if args.output else BENCH_DIR / "results" / f"{datetime.utcnow():%Y%m%dT%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps({
+        "created_at": datetime.utcnow().isoformat(),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "database": os.environ["DATABASE_URL"],
+        "volumes": seeded,
+        "duration_s": args.duration,
+        "results": results,
+    }, indent=2))
+    print(f"\nResults written to {output}")
+
+    if args.baseline:
+        compare(results, args.baseline)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
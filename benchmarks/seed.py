@@ -0,0 +1,156 @@
+"""Seed a benchmark database with configurable volumes.
+
+The database URL comes from DATABASE_URL like the app itself, so import
+this module only after the environment is set (benchmarks.run does that).
+"""
+import random
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import func, insert, select
+
+from app.database import SessionLocal, engine
+from app.models.document import Document, DocumentCategory, DownloadLog
+from app.models.menu import MenuItem
+from app.models.user import User
+from app.search import get_backend
+from app.utils.init_db import seed
+from app.utils.migrations import migrate
+from app.utils.stats import rebuild_download_rollups
+
+DOCUMENT_TYPES = ["law", "standard", "regulation", "shnq", "reference"]
+WORDS = [
+    "beton", "qurilish", "standart", "norma", "loyiha", "bino", "xavfsizlik", "material",
+    "бетон", "строительство", "норматив", "проект", "здание", "безопасность",
+    "concrete", "building", "standard", "design", "safety", "material",
+]
+BATCH_SIZE = 5000
+
+
+@dataclass
+class Volumes:
+    documents: int = 100_000
+    download_logs: int = 1_000_000
+    menu_depth: int = 4
+    menu_fanout: int = 5
+    category_depth: int = 4
+    category_fanout: int = 4
+    users: int = 100
+
+
+def _text(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def _localized(rng: random.Random, words: int) -> Dict[str, str]:
+    return {lang: _text(rng, words) for lang in ("uz", "ru", "en")}
+
+
+def _insert_tree(db, model, depth: int, fanout: int, row) -> List[int]:
+    """Level by level: one executemany per level, parents first."""
+    parent_ids: List[Optional[int]] = [None]
+    for level in range(depth):
+        rows = [row(parent_id, level, position) for parent_id in parent_ids for position in range(fanout)]
+        parent_ids = list(db.scalars(insert(model).returning(model.id), rows))
+    return parent_ids
+
+
+def seed_volumes(volumes: Volumes, seed_value: int = 42) -> Dict[str, int]:
+    rng = random.Random(seed_value)
+    migrate(engine)
+    with SessionLocal() as db:
+        seed(db)
+        now = datetime.utcnow()
+
+        db.execute(insert(User), [
+            {
+                "username": f"bench{n}",
+                "email": f"bench{n}@example.com",
+                # Never logged in; the benchmark authenticates as the seeded admin
+                "hashed_password": "!",
+                "permissions": ["read"],
+                "is_active": True,
+                "created_at": now,
+            }
+            for n in range(volumes.users)
+        ])
+
+        _insert_tree(db, MenuItem, volumes.menu_depth, volumes.menu_fanout, lambda parent_id, level, position: {
+            "title": _localized(rng, 2),
+            "url": f"/section/{level}/{parent_id or 0}/{position}",
+            "icon": "folder",
+            "order": position,
+            "parent_id": parent_id,
+            "permissions": ["read"],
+            "is_active": True,
+            "created_at": now,
+        })
+
+        leaves = _insert_tree(db, DocumentCategory, volumes.category_depth, volumes.category_fanout, lambda parent_id, level, position: {
+            "name": _localized(rng, 2),
+            "description": _localized(rng, 6),
+            "document_type": DOCUMENT_TYPES[position % len(DOCUMENT_TYPES)],
+            "parent_id": parent_id,
+            "order": position,
+            "is_active": True,
+            "created_at": now,
+        })
+        categories = [f"category-{leaf}" for leaf in leaves] or ["general"]
+        db.commit()
+
+        search = get_backend(engine.dialect.name)
+        start = now - timedelta(days=3650)
+        for offset in range(0, volumes.documents, BATCH_SIZE):
+            rows = []
+            for n in range(offset, min(offset + BATCH_SIZE, volumes.documents)):
+                created_at = start + timedelta(seconds=rng.randrange(3650 * 86400))
+                rows.append({
+                    "title": _localized(rng, 5),
+                    "description": _localized(rng, 20),
+                    "content": _text(rng, 200),
+                    "document_type": rng.choice(DOCUMENT_TYPES),
+                    "category": rng.choice(categories),
+                    "document_number": f"BENCH {n}:{created_at.year}",
+                    "author": "Benchmark",
+                    "issue_date": created_at,
+                    "tags": rng.sample(WORDS, 3),
+                    "document_metadata": {},
+                    "is_active": rng.random() > 0.02,
+                    "is_featured": rng.random() < 0.05,
+                    "download_count": 0,
+                    "created_at": created_at,
+                    "updated_at": created_at,
+                })
+            ids = list(db.scalars(insert(Document).returning(Document.id), rows))
+            search.reindex(db.connection(), ids)
+            db.commit()
+
+        document_ids = list(db.scalars(select(Document.id)))
+        for offset in range(0, volumes.download_logs if document_ids else 0, BATCH_SIZE):
+            db.execute(insert(DownloadLog), [
+                {
+                    "document_id": rng.choice(document_ids),
+                    "ip_address": f"10.0.{rng.randrange(256)}.{rng.randrange(256)}",
+                    "user_agent": "benchmark",
+                    "downloaded_at": start + timedelta(seconds=rng.randrange(3650 * 86400)),
+                }
+                for _ in range(min(BATCH_SIZE, volumes.download_logs - offset))
+            ])
+            db.commit()
+
+        counts = (
+            select(DownloadLog.document_id, func.count().label("downloads"))
+            .group_by(DownloadLog.document_id)
+            .subquery()
+        )
+        db.execute(
+            Document.__table__.update()
+            .where(Document.id == counts.c.document_id)
+            .values(download_count=counts.c.downloads)
+        )
+        # download_logs were inserted directly, past the rollup maintenance
+        rebuild_download_rollups(db.connection())
+        db.commit()
+
+    return asdict(volumes)
@@ -0,0 +1,103 @@
+"""initial schema
+
+Matches the tables previously created by Base.metadata.create_all.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("username", sa.String()),
+        sa.Column("email", sa.String()),
+        sa.Column("hashed_password", sa.String()),
+        sa.Column("permissions", sa.JSON()),
+        sa.Column("is_active", sa.Boolean()),
+        sa.Column("created_at", sa.DateTime()),
+    )
+    op.create_index("ix_users_id", "users", ["id"])
+    op.create_index("ix_users_username", "users", ["username"], unique=True)
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    op.create_table(
+        "menu_items",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("title", sa.JSON()),
+        sa.Column("url", sa.String()),
+        sa.Column("icon", sa.String()),
+        sa.Column("order", sa.Integer()),
+        sa.Column("parent_id", sa.Integer(), sa.ForeignKey("menu_items.id"), nullable=True),
+        sa.Column("permissions", sa.JSON()),
+        sa.Column("is_active", sa.Boolean()),
+        sa.Column("created_at", sa.DateTime()),
+    )
+    op.create_index("ix_menu_items_id", "menu_items", ["id"])
+
+    op.create_table(
+        "documents",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("title", sa.JSON()),
+        sa.Column("description", sa.JSON()),
+        sa.Column("content", sa.Text()),
+        sa.Column("document_type", sa.String()),
+        sa.Column("category", sa.String()),
+        sa.Column("document_number", sa.String()),
+        sa.Column("file_path", sa.String()),
+        sa.Column("file_size", sa.Integer()),
+        sa.Column("file_type", sa.String()),
+        sa.Column("download_count", sa.Integer()),
+        sa.Column("author", sa.String()),
+        sa.Column("issue_date", sa.DateTime()),
+        sa.Column("effective_date", sa.DateTime()),
+        sa.Column("tags", sa.JSON()),
+        sa.Column("document_metadata", sa.JSON()),
+        sa.Column("is_active", sa.Boolean()),
+        sa.Column("is_featured", sa.Boolean()),
+        sa.Column("created_at", sa.DateTime()),
+        sa.Column("updated_at", sa.DateTime()),
+        sa.Column("created_by", sa.Integer(), sa.ForeignKey("users.id")),
+    )
+    op.create_index("ix_documents_id", "documents", ["id"])
+
+    op.create_table(
+        "document_categories",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("name", sa.JSON()),
+        sa.Column("description", sa.JSON()),
+        sa.Column("document_type", sa.String()),
+        sa.Column("parent_id", sa.Integer(), sa.ForeignKey("document_categories.id"), nullable=True),
+        sa.Column("order", sa.Integer()),
+        sa.Column("is_active", sa.Boolean()),
+        sa.Column("created_at", sa.DateTime()),
+    )
+    op.create_index("ix_document_categories_id", "document_categories", ["id"])
+
+    op.create_table(
+        "download_logs",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("document_id", sa.Integer(), sa.ForeignKey("documents.id")),
+        sa.Column("user_id", sa.Integer(), sa.ForeignKey("users.id"), nullable=True),
+        sa.Column("ip_address", sa.String()),
+        sa.Column("user_agent", sa.String()),
+        sa.Column("downloaded_at", sa.DateTime()),
+    )
+    op.create_index("ix_download_logs_id", "download_logs", ["id"])
+
+
+def downgrade():
+    op.drop_table("download_logs")
+    op.drop_table("document_categories")
+    op.drop_table("documents")
+    op.drop_table("menu_items")
+    op.drop_table("users")
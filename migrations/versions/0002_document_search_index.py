@@ -0,0 +1,83 @@
+"""document search index
+
+FTS5 table on SQLite, tsvector side table on PostgreSQL (see app.search),
+backfilled from documents. The DDL is a copy of what app.search created
+at this revision, so later changes there do not alter this migration.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+LANGUAGES = ("uz", "ru", "en")
+FTS_TABLE = "documents_fts"
+SEARCH_TABLE = "document_search"
+# Text search configuration per language, as in app.search.postgres
+CONFIGS = {"uz": "simple", "ru": "russian", "en": "english"}
+
+
+def _upgrade_sqlite():
+    fields = (
+        [f"title_{lang}" for lang in LANGUAGES]
+        + [f"description_{lang}" for lang in LANGUAGES]
+        + ["content", "document_number", "tags"]
+    )
+    op.execute(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+        + ", ".join(fields)
+        + ", tokenize = 'unicode61 remove_diacritics 2')"
+    )
+    values = (
+        [f"json_extract(d.title, '$.{lang}')" for lang in LANGUAGES]
+        + [f"json_extract(d.description, '$.{lang}')" for lang in LANGUAGES]
+        + ["d.content", "d.document_number", "(SELECT group_concat(value, ' ') FROM json_each(d.tags))"]
+    )
+    op.execute(f"DELETE FROM {FTS_TABLE}")
+    op.execute(
+        f"INSERT INTO {FTS_TABLE} (rowid, {', '.join(fields)}) "
+        f"SELECT d.id, {', '.join(values)} FROM documents d"
+    )
+
+
+def _upgrade_postgresql():
+    columns = ", ".join(f"search_{lang} tsvector" for lang in LANGUAGES)
+    op.execute(
+        f"CREATE TABLE IF NOT EXISTS {SEARCH_TABLE} ("
+        f"document_id integer PRIMARY KEY REFERENCES documents(id) ON DELETE CASCADE, {columns})"
+    )
+    for lang in LANGUAGES:
+        op.execute(f"CREATE INDEX IF NOT EXISTS ix_{SEARCH_TABLE}_{lang} ON {SEARCH_TABLE} USING gin (search_{lang})")
+    tags = (
+        "coalesce(CASE WHEN json_typeof(d.tags) = 'array' THEN "
+        "(SELECT string_agg(tag, ' ') FROM json_array_elements_text(d.tags) AS tag) END, '')"
+    )
+    vectors = ", ".join(
+        f"setweight(to_tsvector('{CONFIGS[lang]}', coalesce(d.title ->> '{lang}', '')), 'A') || "
+        f"setweight(to_tsvector('simple', coalesce(d.document_number, '')), 'A') || "
+        f"setweight(to_tsvector('{CONFIGS[lang]}', coalesce(d.description ->> '{lang}', '')), 'B') || "
+        f"setweight(to_tsvector('simple', {tags}), 'B') || "
+        f"setweight(to_tsvector('{CONFIGS[lang]}', coalesce(d.content, '')), 'D')"
+        for lang in LANGUAGES
+    )
+    op.execute(
+        f"INSERT INTO {SEARCH_TABLE} (document_id, {', '.join('search_' + lang for lang in LANGUAGES)}) "
+        f"SELECT d.id, {vectors} FROM documents d ON CONFLICT (document_id) DO NOTHING"
+    )
+
+
+def upgrade():
+    if op.get_bind().dialect.name == "sqlite":
+        _upgrade_sqlite()
+    else:
+        _upgrade_postgresql()
+
+
+def downgrade():
+    table = FTS_TABLE if op.get_bind().dialect.name == "sqlite" else SEARCH_TABLE
+    op.execute(f"DROP TABLE IF EXISTS {table}")
@@ -0,0 +1,34 @@
+"""listing indexes
+
+Composite indexes for the document listing and menu tree queries;
+`python -m app.manage check-plans` verifies they are used.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("ix_documents_active_created", "documents", ["is_active", "created_at", "id"]),
+    ("ix_documents_active_category_created", "documents", ["is_active", "category", "created_at", "id"]),
+    ("ix_documents_active_type_created", "documents", ["is_active", "document_type", "created_at", "id"]),
+    ("ix_documents_active_featured_created", "documents", ["is_active", "is_featured", "created_at", "id"]),
+    ("ix_menu_items_active_parent_order", "menu_items", ["is_active", "parent_id", "order"]),
+    ("ix_menu_items_parent_active_order", "menu_items", ["parent_id", "is_active", "order"]),
+]
+
+
+def upgrade():
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns)
+
+
+def downgrade():
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,34 @@
+"""table versions
+
+Per-table change counters used as cheap HTTP validators (app.utils.versions).
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-17
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+VERSIONED_TABLES = ("documents", "document_categories", "menu_items")
+
+
+def upgrade():
+    table = op.create_table(
+        "table_versions",
+        sa.Column("name", sa.String(), primary_key=True),
+        sa.Column("version", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime()),
+    )
+    now = datetime.utcnow()
+    op.bulk_insert(table, [{"name": name, "version": 1, "updated_at": now} for name in VERSIONED_TABLES])
+
+
+def downgrade():
+    op.drop_table("table_versions")
@@ -0,0 +1,73 @@
+"""download rollups
+
+Hourly and daily download counts per document and per document type and
+category (app.utils.stats), backfilled from download_logs, and an index for
+deleting download_logs by age. The backfill SQL is a copy of
+app.utils.stats.rebuild_download_rollups at this revision.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def _bucket(dialect_name, period):
+    if dialect_name == "postgresql":
+        return f"date_trunc('{period}', l.downloaded_at)"
+    # Same text format SQLAlchemy stores SQLite DateTime values in
+    fmt = "%Y-%m-%d %H:00:00.000000" if period == "hour" else "%Y-%m-%d 00:00:00.000000"
+    return f"strftime('{fmt}', l.downloaded_at)"
+
+
+def _backfill():
+    dialect_name = op.get_bind().dialect.name
+    for period in ("hour", "day"):
+        bucket = _bucket(dialect_name, period)
+        op.execute(
+            f"INSERT INTO download_rollups (period, bucket, document_id, downloads) "
+            f"SELECT '{period}', {bucket}, l.document_id, count(*) FROM download_logs l "
+            f"WHERE l.document_id IS NOT NULL GROUP BY {bucket}, l.document_id"
+        )
+        op.execute(
+            f"INSERT INTO download_category_rollups (period, bucket, document_type, category, downloads) "
+            f"SELECT '{period}', {bucket}, coalesce(d.document_type, ''), coalesce(d.category, ''), count(*) "
+            f"FROM download_logs l LEFT JOIN documents d ON d.id = l.document_id "
+            f"WHERE l.document_id IS NOT NULL GROUP BY {bucket}, coalesce(d.document_type, ''), coalesce(d.category, '')"
+        )
+
+
+def upgrade():
+    op.create_table(
+        "download_rollups",
+        sa.Column("period", sa.String(), primary_key=True),
+        sa.Column("bucket", sa.DateTime(), primary_key=True),
+        sa.Column("document_id", sa.Integer(), primary_key=True),
+        sa.Column("downloads", sa.Integer(), nullable=False),
+    )
+    op.create_index(
+        "ix_download_rollups_document_period_bucket", "download_rollups", ["document_id", "period", "bucket"]
+    )
+    op.create_table(
+        "download_category_rollups",
+        sa.Column("period", sa.String(), primary_key=True),
+        sa.Column("bucket", sa.DateTime(), primary_key=True),
+        sa.Column("document_type", sa.String(), primary_key=True),
+        sa.Column("category", sa.String(), primary_key=True),
+        sa.Column("downloads", sa.Integer(), nullable=False),
+    )
+    op.create_index("ix_download_logs_downloaded_at", "download_logs", ["downloaded_at"])
+    _backfill()
+
+
+def downgrade():
+    op.drop_index("ix_download_logs_downloaded_at", table_name="download_logs")
+    op.drop_table("download_category_rollups")
+    op.drop_index("ix_download_rollups_document_period_bucket", table_name="download_rollups")
+    op.drop_table("download_rollups")
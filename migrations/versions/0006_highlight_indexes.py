@@ -0,0 +1,36 @@
+"""highlight indexes
+
+Indexes behind the in-memory highlights (app.utils.highlights): reloading
+the most downloaded and newest featured documents reads highlights_size
+index entries per list instead of sorting the table.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("ix_documents_active_downloads", "documents", ["is_active", "download_count", "id"]),
+    ("ix_documents_active_type_downloads", "documents", ["is_active", "document_type", "download_count", "id"]),
+    (
+        "ix_documents_active_featured_type_created",
+        "documents",
+        ["is_active", "is_featured", "document_type", "created_at", "id"],
+    ),
+]
+
+
+def upgrade():
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns)
+
+
+def downgrade():
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,33 @@
+"""download count version
+
+A table_versions row for download counters, bumped separately from the
+documents version (app.utils.downloads).
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-17
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+table_versions = sa.table(
+    "table_versions",
+    sa.column("name", sa.String()),
+    sa.column("version", sa.Integer()),
+    sa.column("updated_at", sa.DateTime()),
+)
+
+
+def upgrade():
+    op.bulk_insert(table_versions, [{"name": "document_downloads", "version": 1, "updated_at": datetime.utcnow()}])
+
+
+def downgrade():
+    op.execute(table_versions.delete().where(table_versions.c.name == "document_downloads"))
@@ -0,0 +1,44 @@
+"""download logs document foreign key
+
+download_logs.document_id is set to NULL when its document is deleted, so
+deleting a downloaded document no longer violates the foreign key where
+foreign keys are enforced (PostgreSQL). The logs themselves are kept for
+the download history. The new index serves that ON DELETE lookup.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-17
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+FK_NAME = "download_logs_document_id_fkey"
+# 0001 left the constraint unnamed; on SQLite batch mode finds it by this convention
+NAMING_CONVENTION = {"fk": "fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s"}
+
+
+def _document_fk_name():
+    for foreign_key in sa.inspect(op.get_bind()).get_foreign_keys("download_logs"):
+        if foreign_key["constrained_columns"] == ["document_id"]:
+            return foreign_key["name"] or "fk_download_logs_document_id_documents"
+    raise RuntimeError("download_logs.document_id has no foreign key")
+
+
+def upgrade():
+    old_name = _document_fk_name()
+    with op.batch_alter_table("download_logs", naming_convention=NAMING_CONVENTION) as batch_op:
+        batch_op.drop_constraint(old_name, type_="foreignkey")
+        batch_op.create_foreign_key(FK_NAME, "documents", ["document_id"], ["id"], ondelete="SET NULL")
+    op.create_index("ix_download_logs_document_id", "download_logs", ["document_id"])
+
+
+def downgrade():
+    op.drop_index("ix_download_logs_document_id", table_name="download_logs")
+    with op.batch_alter_table("download_logs") as batch_op:
+        batch_op.drop_constraint(FK_NAME, type_="foreignkey")
+        batch_op.create_foreign_key(FK_NAME, "documents", ["document_id"], ["id"])
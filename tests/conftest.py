@@ -0,0 +1,35 @@
+"""Shared test setup.
+
+app.database creates its engines on import, so DATABASE_URL is pointed at a
+throwaway SQLite file here, before any test module imports the app. Foreign
+keys are enforced on it, as they are on PostgreSQL.
+"""
+import os
+import tempfile
+
+import pytest
+from sqlalchemy import event
+
+os.environ["DATABASE_URL"] = "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="tmsiti-tests-"), "app.db")
+
+from app.database import async_engine, async_read_engine, engine  # noqa: E402
+from app.utils.migrations import migrate  # noqa: E402
+
+
+def _enforce_foreign_keys(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute("PRAGMA foreign_keys=ON")
+    finally:
+        cursor.close()
+
+
+for _engine in (engine, async_engine.sync_engine, async_read_engine.sync_engine):
+    event.listen(_engine, "connect", _enforce_foreign_keys)
+
+
+@pytest.fixture(scope="session")
+def database():
+    """The app's database, migrated to head."""
+    migrate(engine)
+    return engine
@@ -0,0 +1,37 @@
+"""The per-process response cache stays bounded, and menu depths share keys."""
+import asyncio
+
+from app.core.cache import LocalBackend, ResponseCache
+from app.utils.tree import MAX_TREE_DEPTH, tree_depth
+
+
+def test_local_backend_evicts_least_recently_used():
+    backend = LocalBackend(max_size=2)
+
+    async def scenario():
+        await backend.set("a", b"1", 60)
+        await backend.set("b", b"2", 60)
+        assert await backend.get("a") == b"1"
+        await backend.set("c", b"3", 60)
+        return [await backend.get(key) for key in ("a", "b", "c")]
+
+    assert asyncio.run(scenario()) == [b"1", None, b"3"]
+
+
+def test_unread_keys_of_old_versions_do_not_accumulate():
+    cache = ResponseCache("menu", ttl=60, backend=LocalBackend(max_size=8))
+
+    async def scenario():
+        for stamp in range(100):
+            await cache.set(f"{stamp}:uz:all", b"[]")
+        return await cache.get("99:uz:all")
+
+    assert asyncio.run(scenario()) == b"[]"
+    assert len(cache.backend._entries) == 8
+
+
+def test_depths_past_the_limit_mean_the_whole_tree():
+    assert tree_depth(None) is None
+    assert tree_depth(3) == 3
+    assert tree_depth(MAX_TREE_DEPTH - 1) == MAX_TREE_DEPTH - 1
+    assert {tree_depth(depth) for depth in (MAX_TREE_DEPTH, MAX_TREE_DEPTH + 1, 10 ** 6)} == {None}
@@ -0,0 +1,77 @@
+"""Download accounting around deleted documents, with foreign keys enforced (see conftest)."""
+import asyncio
+
+from sqlalchemy import select
+
+from app.database import SessionLocal, dispose_engines
+from app.models.document import Document, DownloadLog
+from app.utils.downloads import DownloadRecorder
+from app.utils.writes import write_queue
+
+
+def _run(coroutine):
+    async def main():
+        try:
+            return await coroutine
+        finally:
+            await write_queue.stop()
+            await dispose_engines()
+
+    return asyncio.run(main())
+
+
+def _create_document(title: str) -> int:
+    with SessionLocal() as db:
+        document = Document(title={"uz": title}, description={"uz": title}, document_type="law")
+        db.add(document)
+        db.commit()
+        return document.id
+
+
+async def _delete_document(document_id: int):
+    # The body of DELETE /api/documents/{doc_id}
+    async def delete(db):
+        await db.delete(await db.get(Document, document_id))
+
+    await write_queue.submit(delete)
+
+
+def _logs(user_agent: str):
+    with SessionLocal() as db:
+        return db.execute(
+            select(DownloadLog.document_id).where(DownloadLog.user_agent == user_agent)
+        ).scalars().all()
+
+
+def test_deleting_a_downloaded_document_keeps_its_logs(database):
+    document_id = _create_document("downloaded")
+    recorder = DownloadRecorder(60, 100, 60)
+
+    async def scenario():
+        recorder.record(document_id, None, None, "delete-after-flush")
+        await recorder.flush()
+        await _delete_document(document_id)
+
+    _run(scenario())
+    assert recorder.flushed == 1
+    with SessionLocal() as db:
+        assert db.get(Document, document_id) is None
+    assert _logs("delete-after-flush") == [None]
+
+
+def test_downloads_of_a_deleted_document_do_not_drop_the_batch(database):
+    kept_id = _create_document("kept")
+    deleted_id = _create_document("deleted")
+    recorder = DownloadRecorder(60, 100, 60)
+
+    async def scenario():
+        recorder.record(kept_id, None, None, "delete-before-flush")
+        recorder.record(deleted_id, None, None, "delete-before-flush")
+        await _delete_document(deleted_id)
+        await recorder.flush()
+
+    _run(scenario())
+    assert (recorder.flushed, recorder.pending, recorder.dropped) == (2, 0, 0)
+    assert _logs("delete-before-flush") == [kept_id]
+    with SessionLocal() as db:
+        assert db.get(Document, kept_id).download_count == 1
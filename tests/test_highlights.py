@@ -0,0 +1,119 @@
+"""Incremental maintenance of the in-memory highlights lists (no database)."""
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from app.utils.highlights import FEATURED, POPULAR, RANKINGS, HighlightIndex, RankedList
+
+DAY = datetime(2026, 1, 1)
+
+
+def entry(document_id, downloads=0, age_days=0, featured=False, document_type="law", active=True) -> dict:
+    return {
+        "id": document_id,
+        "title": {"uz": f"d{document_id}"},
+        "document_number": None,
+        "document_type": document_type,
+        "category": None,
+        "issue_date": None,
+        "effective_date": None,
+        "file_size": None,
+        "file_type": None,
+        "download_count": downloads,
+        "is_featured": featured,
+        "created_at": DAY - timedelta(days=age_days),
+        "is_active": active,
+    }
+
+
+def popular(*entries, capacity=3, complete=False) -> RankedList:
+    return RankedList(RANKINGS[POPULAR], capacity, entries, complete=complete)
+
+
+def ids(ranked: RankedList):
+    return [item["id"] for item in ranked.top(len(ranked))]
+
+
+def loaded_index(*entries, size=3) -> HighlightIndex:
+    """An index as reload() leaves it, without the database."""
+    index = HighlightIndex(size, refresh_interval=60)
+    for document_type in (None, "law"):
+        for ranking in RANKINGS:
+            # The top `size` rows; fewer means that is every document of the list
+            key = RANKINGS[ranking]
+            members = sorted((item for item in entries if ranking == POPULAR or item["is_featured"]), key=key)[:size]
+            index.lists[ranking, document_type] = RankedList(key, size, members, complete=len(members) < size)
+    index.version = (1, 1)
+    index.stale = False
+    return index
+
+
+def test_entry_below_the_tail_of_an_incomplete_list_is_dropped():
+    ranked = popular(entry(1, 10), entry(2, 8), entry(3, 6))
+    ranked.discard(3)
+    ranked.add(entry(4, 1))
+    # Documents outside the list may rank between 2 and 4
+    assert ids(ranked) == [1, 2]
+
+
+def test_entry_below_the_tail_of_a_complete_list_is_kept():
+    ranked = popular(entry(1, 10), entry(2, 8), complete=True)
+    ranked.add(entry(3, 1))
+    assert ids(ranked) == [1, 2, 3]
+    assert ranked.complete
+
+
+def test_insert_at_capacity_evicts_the_tail_and_clears_complete():
+    ranked = popular(entry(1, 10), entry(2, 8), entry(3, 6), complete=True)
+    ranked.add(entry(4, 9))
+    assert ids(ranked) == [1, 4, 2]
+    assert not ranked.complete
+    # 3 is now outside the list: nothing below 2 can be placed any more
+    ranked.add(entry(5, 7))
+    assert ids(ranked) == [1, 4, 2]
+
+
+def test_removal_marks_a_short_list_stale():
+    index = loaded_index(entry(1, 10), entry(2, 8), entry(3, 6))
+    assert not index.lists[POPULAR, None].complete
+    index.remove(1)
+    assert [item["id"] for item in index.top(POPULAR, None, 2)] == [2, 3]
+    assert not index.stale
+    assert [item["id"] for item in index.top(POPULAR, None, 3)] == [2, 3]
+    assert index.stale
+
+
+def test_removal_from_a_complete_list_is_not_stale():
+    index = loaded_index(entry(1, 10), entry(2, 8), size=5)
+    index.remove(1)
+    assert [item["id"] for item in index.top(POPULAR, None, 5)] == [2]
+    assert not index.stale
+
+
+def test_download_counts_reorder_the_popular_lists():
+    index = loaded_index(entry(1, 10, featured=True), entry(2, 8), entry(3, 6, age_days=1, featured=True))
+    index.record_downloads({3: 5, 2: 1, 99: 4})
+    for document_type in (None, "law"):
+        assert [(item["id"], item["download_count"]) for item in index.top(POPULAR, document_type, 3)] == [
+            (3, 11), (1, 10), (2, 9)
+        ]
+    # Newest first, download counts play no part
+    assert [item["id"] for item in index.top(FEATURED, None, 3)] == [1, 3]
+
+
+def test_edited_member_at_the_tail_keeps_its_place():
+    index = loaded_index(entry(1, 10), entry(2, 8), entry(3, 6))
+    edited = {**entry(3, 6), "title": {"uz": "edited"}}
+    index.upsert(SimpleNamespace(**edited))
+    ranked = index.lists[POPULAR, None]
+    assert ids(ranked) == [1, 2, 3]
+    assert ranked.top(3)[2]["title"] == {"uz": "edited"}
+
+
+def test_upsert_moves_a_document_to_its_new_type_and_drops_inactive_ones():
+    index = loaded_index(entry(1, 10), entry(2, 8), size=5)
+    index.upsert(SimpleNamespace(**entry(2, 8, document_type="standard")))
+    assert ids(index.lists[POPULAR, "law"]) == [1]
+    assert ids(index.lists[POPULAR, "standard"]) == [2]
+    index.upsert(SimpleNamespace(**entry(1, 10, active=False)))
+    assert ids(index.lists[POPULAR, None]) == [2]
+    assert ids(index.lists[POPULAR, "law"]) == []
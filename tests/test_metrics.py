@@ -0,0 +1,35 @@
+"""Slow-query logging keeps bound parameters out of the log unless asked to."""
+import logging
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from app.config import settings
+from app.core.metrics import instrument_engine
+
+
+@pytest.fixture
+def log_every_query(monkeypatch, caplog):
+    monkeypatch.setattr(settings, "slow_query_threshold_ms", 1e-9)
+    caplog.set_level(logging.WARNING, logger="app.core.metrics")
+    engine = create_engine("sqlite://")
+    instrument_engine(engine)
+
+    def run():
+        with engine.connect() as connection:
+            connection.execute(text("SELECT :password"), {"password": "hunter2"})
+        return caplog.text
+
+    yield run
+    engine.dispose()
+
+
+def test_slow_query_log_omits_parameters(log_every_query):
+    logged = log_every_query()
+    assert "Slow query" in logged and "SELECT ?" in logged
+    assert "hunter2" not in logged
+
+
+def test_slow_query_parameters_are_opt_in(log_every_query, monkeypatch):
+    monkeypatch.setattr(settings, "slow_query_log_parameters", True)
+    assert "hunter2" in log_every_query()
@@ -0,0 +1,24 @@
+"""The `python -m app.manage check-plans` regression check, runnable by pytest in CI.
+
+Runs against a freshly migrated SQLite file, or against PLAN_CHECK_DATABASE_URL
+(e.g. a PostgreSQL service container) when that is set; that database is
+migrated to head first.
+"""
+import os
+
+from sqlalchemy import create_engine
+
+from app.utils.migrations import migrate
+from app.utils.query_plans import check_query_plans
+
+
+def test_hot_queries_use_their_indexes(tmp_path):
+    url = os.environ.get("PLAN_CHECK_DATABASE_URL") or f"sqlite:///{tmp_path / 'plans.db'}"
+    engine = create_engine(url)
+    try:
+        migrate(engine)
+        with engine.begin() as connection:
+            problems = check_query_plans(connection)
+    finally:
+        engine.dispose()
+    assert not problems, "\n\n".join(f"{problem.query}: {problem.problem}\n{problem.plan}" for problem in problems)
@@ -0,0 +1,35 @@
+"""Password hashes follow the configured bcrypt cost factor."""
+import pytest
+
+from app.config import settings
+from app.core.security import get_password_hash, get_pwd_context, verify_and_update_password
+
+
+@pytest.fixture
+def bcrypt_rounds(monkeypatch):
+    def use(rounds: int):
+        monkeypatch.setattr(settings, "bcrypt_rounds", rounds)
+        get_pwd_context.cache_clear()
+
+    yield use
+    get_pwd_context.cache_clear()
+
+
+@pytest.mark.parametrize("old_rounds, new_rounds", [(4, 5), (5, 4)])
+def test_hash_with_another_cost_factor_is_upgraded_on_login(bcrypt_rounds, old_rounds, new_rounds):
+    bcrypt_rounds(old_rounds)
+    hashed = get_password_hash("secret")
+    assert hashed.startswith(f"$2b${old_rounds:02d}$")
+
+    bcrypt_rounds(new_rounds)
+    verified, new_hash = verify_and_update_password("secret", hashed)
+    assert verified
+    assert new_hash is not None and new_hash.startswith(f"$2b${new_rounds:02d}$")
+    assert verify_and_update_password("secret", new_hash) == (True, None)
+
+
+def test_wrong_password_is_not_rehashed(bcrypt_rounds):
+    bcrypt_rounds(4)
+    hashed = get_password_hash("secret")
+    bcrypt_rounds(5)
+    assert verify_and_update_password("wrong", hashed) == (False, None)